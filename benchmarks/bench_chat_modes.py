@@ -0,0 +1,97 @@
+# bench_chat_modes.py
+"""Compare POST /chat response modes against a running server.
+
+Usage:
+    python main.py &
+    python benchmarks/bench_chat_modes.py --url http://127.0.0.1:5000 -n 5
+
+Reports, per mode, the latency until the reply text is available and until
+the full response is read, plus the ElevenLabs characters billed. The
+"saved" lines show what a text-only client (chat_v2.html) no longer pays.
+"""
+import argparse
+import statistics
+import time
+import requests
+
+MESSAGES = [
+    "Hallo! Wie geht es dir?",
+    "Kannst du mir den Unterschied zwischen 'seit' und 'seid' erklären?",
+    "Ich möchte heute über Essen sprechen.",
+]
+
+# ElevenLabs bills per character; override with the plan you are on
+DEFAULT_PRICE_PER_1K_CHARS = 0.30  # USD
+
+
+def run_once(base_url, mode, message):
+    """Send one chat message and time it"""
+    start = time.perf_counter()
+    resp = requests.post(
+        f"{base_url}/chat",
+        params={"mode": mode},
+        json={"message": message},
+        stream=True,
+        timeout=120,
+    )
+    resp.raise_for_status()
+    headers_at = time.perf_counter() - start
+
+    body = b"".join(resp.iter_content(chunk_size=8192))
+    total = time.perf_counter() - start
+
+    if mode == "text":
+        synthesized_chars = 0
+    else:
+        # Every reply character is sent to ElevenLabs in audio modes
+        synthesized_chars = len(resp.headers.get("X-Reply-Text", ""))
+
+    return {
+        "text_ready": headers_at,
+        "total": total,
+        "bytes": len(body),
+        "chars": synthesized_chars,
+    }
+
+
+def summarize(samples, key):
+    values = [s[key] for s in samples]
+    return statistics.median(values), max(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("-n", type=int, default=3, help="rounds per message")
+    parser.add_argument("--modes", default="text,audio,both")
+    parser.add_argument("--price-per-1k", type=float, default=DEFAULT_PRICE_PER_1K_CHARS)
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    results = {mode: [] for mode in modes}
+
+    for _ in range(args.n):
+        for message in MESSAGES:
+            for mode in modes:
+                results[mode].append(run_once(args.url, mode, message))
+
+    print(f"{'mode':<6} {'text p50':>9} {'total p50':>10} {'total max':>10} {'KB/msg':>8} {'chars/msg':>10} {'$/msg':>8}")
+    per_mode = {}
+    for mode, samples in results.items():
+        text_p50, _ = summarize(samples, "text_ready")
+        total_p50, total_max = summarize(samples, "total")
+        kb = statistics.mean(s["bytes"] for s in samples) / 1024
+        chars = statistics.mean(s["chars"] for s in samples)
+        cost = chars / 1000 * args.price_per_1k
+        per_mode[mode] = (total_p50, chars, cost)
+        print(f"{mode:<6} {text_p50:>8.2f}s {total_p50:>9.2f}s {total_max:>9.2f}s {kb:>8.1f} {chars:>10.0f} {cost:>8.4f}")
+
+    if "text" in per_mode and "audio" in per_mode:
+        saved_latency = per_mode["audio"][0] - per_mode["text"][0]
+        saved_chars = per_mode["audio"][1] - per_mode["text"][1]
+        saved_cost = per_mode["audio"][2] - per_mode["text"][2]
+        print(f"\nsaved per text message: {saved_latency:.2f}s, {saved_chars:.0f} TTS chars, ${saved_cost:.4f}")
+
+
+if __name__ == "__main__":
+    main()
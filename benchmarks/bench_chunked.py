@@ -0,0 +1,63 @@
+# bench_chunked.py
+"""Throughput of chunked transcription for long recordings on N workers.
+
+Usage:
+    python benchmarks/bench_chunked.py lecture.mp3 --workers 1 2 4 8
+    python benchmarks/bench_chunked.py clip.wav --hours 2 --workers 4 8 16
+
+The clip is decoded once; with --hours its PCM is repeated up to that
+length. For each worker count it prints wall time, chunks per second and
+the realtime factor (audio seconds transcribed per wall second).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.audio_decode import SAMPLE_RATE, SAMPLE_WIDTH, decoder_available, decode_to_pcm  # noqa: E402
+from src.chunked_transcribe import ChunkedTranscriber  # noqa: E402
+from src.ffmpeg_pool import ffmpeg_pool  # noqa: E402
+from src.transcribe_v2 import client  # noqa: E402
+
+
+def load_pcm(path, hours=None):
+    data = Path(path).read_bytes()
+    file_ext = Path(path).suffix.lower()
+    pcm = decode_to_pcm(data, file_ext) if decoder_available(file_ext) else ffmpeg_pool.convert(data)
+    if hours:
+        target = int(hours * 3600 * SAMPLE_RATE) * SAMPLE_WIDTH
+        pcm = (pcm * (target // len(pcm) + 1))[:target]
+    return pcm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clip")
+    parser.add_argument("--hours", type=float, help="repeat the clip up to this length")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    if client is None:
+        sys.exit("Whisper client not initialized")
+
+    pcm = load_pcm(args.clip, args.hours)
+    audio_seconds = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    print(f"{os.path.basename(args.clip)}: {audio_seconds / 60:.1f} min of audio")
+
+    print(f"{'workers':>7} {'chunks':>7} {'failed':>7} {'wall s':>9} {'chunks/s':>9} {'x realtime':>11}")
+    for workers in args.workers:
+        transcriber = ChunkedTranscriber(client, workers=workers)
+        started = time.perf_counter()
+        result = transcriber.transcribe_pcm(pcm)
+        wall = time.perf_counter() - started
+        print(
+            f"{workers:>7} {result['chunks']:>7} {len(result['failed_chunks']):>7} "
+            f"{wall:>9.1f} {result['chunks'] / wall:>9.2f} {audio_seconds / wall:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
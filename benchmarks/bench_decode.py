@@ -0,0 +1,100 @@
+# bench_decode.py
+"""Compare the in-process decoder with the ffmpeg subprocess path.
+
+Usage:
+    python benchmarks/bench_decode.py clip.webm [clip2.ogg ...] -n 20
+
+For each clip it runs both paths n times and prints median wall time and
+CPU time per request. CPU includes child processes, so ffmpeg's own work
+is counted, not only the fork/exec overhead.
+"""
+import argparse
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.audio_decode import decode_to_pcm, pcm_to_wav, decoder_available  # noqa: E402
+from src.ffmpeg_pool import ffmpeg_pool  # noqa: E402
+from src.transcribe_v2 import AudioProcessor  # noqa: E402
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(fn, n):
+    walls, cpus = [], []
+    for _ in range(n):
+        time.sleep(0.05)  # idle gap between requests (lets the pool re-spawn spares)
+        cpu_start = cpu_seconds()
+        start = time.perf_counter()
+        fn()
+        walls.append(time.perf_counter() - start)
+        cpus.append(cpu_seconds() - cpu_start)
+    return statistics.median(walls) * 1000, statistics.median(cpus) * 1000
+
+
+def in_process(data, file_ext):
+    return lambda: pcm_to_wav(decode_to_pcm(data, file_ext))
+
+
+def ffmpeg_pool_path(data, file_ext):
+    return lambda: pcm_to_wav(ffmpeg_pool.convert(data))
+
+
+def ffmpeg_path(data, file_ext):
+    """What /transcribe did before: temp upload, ffmpeg to MP3, read back"""
+
+    def run():
+        with tempfile.NamedTemporaryFile(suffix=file_ext, delete=False) as f:
+            f.write(data)
+            input_path = f.name
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
+            output_path = f.name
+        try:
+            AudioProcessor.check_ffmpeg()
+            converted = AudioProcessor.convert_to_whisper_format(input_path, output_path)
+            with open(converted, "rb") as f:
+                f.read()
+        finally:
+            for path in (input_path, output_path, output_path.replace(".mp3", ".wav")):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("-n", type=int, default=10, help="runs per clip and path")
+    args = parser.parse_args()
+
+    print(f"{'clip':<30} {'path':<12} {'wall ms':>9} {'cpu ms':>9}")
+    for clip in args.clips:
+        data = Path(clip).read_bytes()
+        file_ext = Path(clip).suffix.lower()
+        paths = [
+            ("ffmpeg_pool", ffmpeg_pool_path(data, file_ext)),
+            ("ffmpeg", ffmpeg_path(data, file_ext)),
+        ]
+        if decoder_available(file_ext):
+            paths.insert(0, ("in_process", in_process(data, file_ext)))
+        else:
+            print(f"{os.path.basename(clip):<30} in_process   (no decoder installed for {file_ext})")
+
+        for name, fn in paths:
+            wall, cpu = measure(fn, args.n)
+            print(f"{os.path.basename(clip):<30} {name:<12} {wall:>9.1f} {cpu:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
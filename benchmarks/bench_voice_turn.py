@@ -0,0 +1,276 @@
+# bench_voice_turn.py
+"""End-to-end latency of a voice turn, per stage, at several concurrency levels.
+
+Usage:
+    python serve.py &
+    python benchmarks/bench_voice_turn.py --url http://127.0.0.1:5000 --concurrency 1 4 16 -n 40
+    python benchmarks/bench_voice_turn.py --clips recordings/*.webm --compare benchmarks/results/<old>.json
+
+Each turn does what the voice UI does: POST the clip to /transcribe, stream
+the transcript through /chat/stream, then POST the reply to /tts. Reported
+per stage (p50/p95/p99, seconds):
+
+    upload, decode, vad, stt     server-side, from the "timings" of /transcribe
+    transcribe                   client wall time of /transcribe
+    llm_first_token, llm_total   first token event / done event of /chat/stream
+    tts_first_byte, tts_total    first / last audio byte of /tts
+    turn                         the whole turn
+
+Results go to a JSON file (default benchmarks/results/voice_turn-<commit>-<time>.json).
+With --compare, p95 per stage is diffed against an earlier file, and
+--max-regression makes the run exit 1 if any stage got slower by more than
+that many percent. Use benchmarks/mock_upstream.py for repeatable numbers.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CLIPS = sorted(glob.glob(os.path.join(ROOT_DIR, "old", "static", "voice", "*.mp3")))
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+SERVER_STAGES = ("upload", "decode", "vad", "stt")
+STAGES = SERVER_STAGES + (
+    "transcribe", "llm_first_token", "llm_total", "tts_first_byte", "tts_total", "turn",
+)
+MIN_REGRESSION_SECONDS = 0.01  # smaller p95 changes are noise, whatever the percentage
+FALLBACK_MESSAGE = "Hallo! Wie geht es dir heute?"  # when STT returns nothing usable
+CLIP_MIMETYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".webm": "audio/webm", ".ogg": "audio/ogg", ".m4a": "audio/mp4"}
+
+_local = threading.local()
+
+
+def session():
+    # One keep-alive connection per worker thread
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return round(values[max(0, math.ceil(q * len(values)) - 1)], 4)
+
+
+def transcribe(base_url, clip):
+    name, data = clip
+    ext = os.path.splitext(name)[1].lower()
+    start = time.perf_counter()
+    resp = session().post(
+        f"{base_url}/transcribe",
+        files={"audio": (name, data, CLIP_MIMETYPES.get(ext, "application/octet-stream"))},
+        timeout=120,
+    )
+    elapsed = time.perf_counter() - start
+    resp.raise_for_status()
+    body = resp.json()
+    return elapsed, body.get("text") or "", body.get("timings") or {}
+
+
+def chat_stream(base_url, message, session_id):
+    """(first token, done, reply) from /chat/stream"""
+    start = time.perf_counter()
+    first_token = None
+    resp = session().post(
+        f"{base_url}/chat/stream",
+        json={"message": message, "session_id": session_id},
+        stream=True,
+        timeout=120,
+    )
+    resp.raise_for_status()
+    event = None
+    for line in resp.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            payload = json.loads(line[5:])
+            if event == "error":
+                raise RuntimeError(payload.get("error"))
+            if event == "done":
+                return first_token, time.perf_counter() - start, payload.get("reply", "")
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        elif not line:
+            event = None
+    raise RuntimeError("stream ended without a done event")
+
+
+def tts(base_url, text):
+    start = time.perf_counter()
+    first_byte = None
+    resp = session().post(f"{base_url}/tts", json={"text": text}, stream=True, timeout=120)
+    resp.raise_for_status()
+    for chunk in resp.iter_content(chunk_size=4096):
+        if chunk and first_byte is None:
+            first_byte = time.perf_counter() - start
+    return first_byte, time.perf_counter() - start
+
+
+def run_turn(base_url, clip, index):
+    start = time.perf_counter()
+    sample = {}
+    sample["transcribe"], text, timings = transcribe(base_url, clip)
+    for stage in SERVER_STAGES:
+        if stage in timings:
+            sample[stage] = timings[stage]
+    session_id = f"bench-{os.getpid()}-{index}"  # fresh memory per turn
+    first_token, total, reply = chat_stream(base_url, text.strip() or FALLBACK_MESSAGE, session_id)
+    sample["llm_first_token"], sample["llm_total"] = first_token, total
+    sample["tts_first_byte"], sample["tts_total"] = tts(base_url, reply or FALLBACK_MESSAGE)
+    sample["turn"] = time.perf_counter() - start
+    return sample
+
+
+def run_level(base_url, clips, concurrency, turns):
+    samples, errors = [], []
+
+    def one(index):
+        try:
+            return run_turn(base_url, clips[index % len(clips)], index)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for sample in pool.map(one, range(turns)):
+            if sample:
+                samples.append(sample)
+    wall = time.perf_counter() - start
+
+    stages = {}
+    for stage in STAGES:
+        values = sorted(s[stage] for s in samples if s.get(stage) is not None)
+        if values:
+            stages[stage] = {
+                "n": len(values),
+                "mean": round(statistics.fmean(values), 4),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+            }
+    return {
+        "concurrency": concurrency,
+        "turns": turns,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "wall": round(wall, 3),
+        "turns_per_sec": round(len(samples) / wall, 3) if wall else None,
+        "stages": stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_level(level):
+    print(f"\nconcurrency {level['concurrency']}: {level['turns']} turns, "
+          f"{level['errors']} errors, {level['turns_per_sec']} turns/s")
+    for error in level["error_samples"]:
+        print(f"  ! {error}")
+    print(f"  {'stage':<16} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for stage, s in level["stages"].items():
+        print(f"  {stage:<16} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['p99']:>8.3f}")
+
+
+def compare(results, baseline, max_regression):
+    """Print p95 changes per stage; returns the stages over max_regression"""
+    print(f"\np95 vs {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    regressions = []
+    old_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in results["levels"]:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        for stage, s in level["stages"].items():
+            before = old["stages"].get(stage, {}).get("p95")
+            if not before:
+                continue
+            change = (s["p95"] - before) / before * 100
+            flag = ""
+            if (
+                max_regression is not None
+                and change > max_regression
+                and s["p95"] - before > MIN_REGRESSION_SECONDS
+            ):
+                flag = "  REGRESSION"
+                regressions.append((level["concurrency"], stage, change))
+            print(f"  c={level['concurrency']:<4} {stage:<16} {before:>8.3f} -> {s['p95']:>8.3f} ({change:+.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency of /transcribe -> /chat/stream -> /tts")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--clips", nargs="+", default=DEFAULT_CLIPS, help="recorded fixture clips")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("-n", "--turns", type=int, default=20, help="turns per concurrency level")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed turns before the first level")
+    parser.add_argument("--output", help="results JSON path")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    parser.add_argument("--max-regression", type=float, help="exit 1 if a stage's p95 grew by more %%")
+    args = parser.parse_args()
+
+    if not args.clips:
+        parser.error("no clips found; pass --clips")
+    clips = []
+    for path in args.clips:
+        with open(path, "rb") as f:
+            clips.append((os.path.basename(path), f.read()))
+    base_url = args.url.rstrip("/")
+
+    for i in range(args.warmup):
+        try:
+            run_turn(base_url, clips[i % len(clips)], -1 - i)
+        except Exception as e:
+            print(f"warmup turn failed: {e}")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "url": base_url,
+            "clips": [name for name, _ in clips],
+            "turns_per_level": args.turns,
+        },
+        "levels": [],
+    }
+    for concurrency in args.concurrency:
+        level = run_level(base_url, clips, concurrency, args.turns)
+        results["levels"].append(level)
+        print_level(level)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"voice_turn-{results['meta']['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
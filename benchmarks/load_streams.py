@@ -0,0 +1,113 @@
+# load_streams.py
+"""Concurrent-stream capacity of a running server.
+
+Usage:
+    python main.py &      # before: threaded dev server
+    python benchmarks/load_streams.py --url http://127.0.0.1:5000 --levels 10 50 100 500
+    python serve.py &     # after: gevent runtime
+    python benchmarks/load_streams.py --url http://127.0.0.1:5000 --levels 10 50 100 500 1000
+
+At each level it holds that many /chat/stream SSE requests open at once
+(or POST /tts with --tts) and reads every stream to the end. A level
+passes while errors stay under 1% and p95 time-to-first-byte stays under
+--max-ttfb; the last passing level is reported as the capacity.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+MESSAGE = "Erzähl mir in zwei Sätzen etwas über Berlin."
+TTS_TEXT = "Hallo! Schön, dass du heute wieder da bist."
+
+
+async def one_stream(client, base_url, tts):
+    started = time.perf_counter()
+    if tts:
+        request = client.build_request("POST", f"{base_url}/tts", json={"text": TTS_TEXT})
+    else:
+        request = client.build_request(
+            "GET", f"{base_url}/chat/stream", params={"message": MESSAGE}
+        )
+    ttfb = None
+    tail = b""
+    response = await client.send(request, stream=True)
+    try:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            if not tts:
+                if b"event: error" in tail + chunk:
+                    raise RuntimeError("upstream error event in stream")
+                tail = chunk[-16:]  # a marker split across two chunks
+    finally:
+        await response.aclose()
+    total = time.perf_counter() - started
+    return ttfb or total, total
+
+
+async def run_level(base_url, concurrency, tts, timeout):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(one_stream(client, base_url, tts) for _ in range(concurrency)),
+            return_exceptions=True,
+        )
+        wall = time.perf_counter() - started
+
+    ok = [r for r in results if not isinstance(r, BaseException)]
+    errors = len(results) - len(ok)
+    ttfbs = sorted(r[0] for r in ok)
+    totals = sorted(r[1] for r in ok)
+    return {
+        "concurrency": concurrency,
+        "ok": len(ok),
+        "errors": errors,
+        "ttfb_p50": statistics.median(ttfbs) if ttfbs else None,
+        "ttfb_p95": ttfbs[min(len(ttfbs) - 1, int(0.95 * len(ttfbs)))] if ttfbs else None,
+        "total_p50": statistics.median(totals) if totals else None,
+        "wall": wall,
+    }
+
+
+def fmt(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+async def main_async(args):
+    capacity = 0
+    print(f"{'streams':>8} {'ok':>6} {'errors':>6} {'ttfb p50':>9} {'ttfb p95':>9} {'total p50':>10} {'wall s':>7}")
+    for level in args.levels:
+        r = await run_level(args.url, level, args.tts, args.timeout)
+        print(
+            f"{r['concurrency']:>8} {r['ok']:>6} {r['errors']:>6} {fmt(r['ttfb_p50']):>9} "
+            f"{fmt(r['ttfb_p95']):>9} {fmt(r['total_p50']):>10} {r['wall']:>7.1f}"
+        )
+        passed = (
+            r["errors"] <= 0.01 * level
+            and r["ttfb_p95"] is not None
+            and r["ttfb_p95"] <= args.max_ttfb
+        )
+        if not passed:
+            break
+        capacity = level
+        await asyncio.sleep(args.pause)
+    print(f"Capacity: {capacity} concurrent streams")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument("--tts", action="store_true", help="stream POST /tts instead of /chat/stream")
+    parser.add_argument("--max-ttfb", type=float, default=5.0, help="seconds, p95 limit per level")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--pause", type=float, default=2.0, help="seconds between levels")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+# mock_upstream.py
+"""Local stand-in for Whisper, Groq, ElevenLabs and the Google Docs export.
+
+Usage:
+    python benchmarks/mock_upstream.py --port 8090
+    python benchmarks/mock_upstream.py --profile slow.json --seed 7
+    python benchmarks/mock_upstream.py --set groq.tokens_per_second=80 --set whisper.errors.503=0.05
+    python benchmarks/mock_upstream.py --scale 0      # no injected latency at all
+
+Point the app at it (then run any benchmark against the app as usual):
+    WHISPER_BASE_URL=http://127.0.0.1:8090/v1/ \\
+    GROQ_BASE_URL=http://127.0.0.1:8090 \\
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8090 \\
+    SYSTEM_PROMPT_URL="http://127.0.0.1:8090/document/d/mock/export?format=txt" \\
+    GROQ_API_KEY=mock ELEVENLABS_API_KEY=mock python serve.py
+
+Endpoints:
+    POST /v1/audio/transcriptions                   OpenAI-compatible Whisper (json, text, verbose_json)
+    POST /openai/v1/chat/completions                Groq chat, plain or streamed (SSE, x_groq usage)
+    POST /v1/text-to-speech/<voice_id>/stream       ElevenLabs streaming TTS (silent MP3 frames)
+    GET  /document/d/<doc_id>/export                Google Docs text export (ETag / 304)
+    GET  /__mock/stats, GET|PUT /__mock/profile     counters and the live profile
+
+Every service draws its time-to-first-byte from a log-normal distribution
+(median, sigma) and its failures from `errors` ({status: probability});
+streams then run at the configured throughput and can be cut off midway
+(`abort_rate`). Draws come from a generator seeded with (seed, service,
+request number), so the n-th request of a service sees the same latency
+and outcome on every run.
+"""
+import argparse
+import copy
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import wave
+
+try:
+    from gevent import monkey
+
+    monkey.patch_all()
+    from gevent.pywsgi import WSGIServer
+    GEVENT_AVAILABLE = True
+except ImportError:
+    WSGIServer = None
+    GEVENT_AVAILABLE = False
+
+from flask import Flask, Response, jsonify, request  # noqa: E402
+
+# Configuration
+DEFAULT_PROFILE = {
+    "whisper": {
+        "ttfb": {"median": 0.15, "sigma": 0.3},
+        # Processing seconds per audio second, matched against the model name
+        "realtime_factor": {"tiny": 0.04, "base": 0.06, "small": 0.12, "medium": 0.25, "large": 0.4},
+        "avg_logprob": {"tiny": -0.55, "base": -0.45, "small": -0.3, "medium": -0.25, "large": -0.2},
+        "words_per_second": 2.5,
+        "errors": {},
+    },
+    "groq": {
+        "ttfb": {"median": 0.25, "sigma": 0.4},
+        "tokens_per_second": 250,
+        "reply_words": {"median": 40, "sigma": 0.5},
+        "errors": {},
+        "abort_rate": 0.0,
+    },
+    "elevenlabs": {
+        "ttfb": {"median": 0.3, "sigma": 0.3},
+        "seconds_per_char": 0.065,  # spoken length of the text
+        "speed": 4.0,  # audio generated this many times faster than realtime
+        "errors": {},
+        "abort_rate": 0.0,
+    },
+    "docs": {
+        "ttfb": {"median": 0.1, "sigma": 0.2},
+        "text": "Du bist ein geduldiger Deutschlehrer. Antworte kurz und auf Deutsch.",
+        "errors": {},
+    },
+}
+TOKENS_PER_WORD = 1.3
+RETRY_AFTER_SECONDS = 1  # sent with injected 429/503
+MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)  # MPEG-1 Layer III, 128 kbps, 44.1 kHz
+MP3_FRAME_SECONDS = 1152 / 44100
+MP3_FRAMES_PER_CHUNK = 10
+COMPRESSED_BYTES_PER_SECOND = 4000  # duration guess for non-WAV uploads (~32 kbps)
+
+WORDS = (
+    "ich du wir heute morgen gerne sehr gut Haus Stadt Zeit Buch lernen sprechen "
+    "verstehen schreiben Deutsch Freund Arbeit Wetter schön immer wieder noch "
+    "vielleicht natürlich wirklich zusammen Frage Antwort Beispiel Satz"
+).split()
+
+
+class MockUpstream:
+    """Profile, per-service counters and the random draws behind every response"""
+
+    def __init__(self, profile=None, scale=1.0, seed=0):
+        self.profile = merge(copy.deepcopy(DEFAULT_PROFILE), profile or {})
+        self.scale = scale
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._stats = {
+            service: {"requests": 0, "errors": 0, "aborted": 0, "in_flight": 0, "bytes": 0}
+            for service in DEFAULT_PROFILE
+        }
+
+    def rng(self, service):
+        """Generator for the next request of service (same sequence every run)"""
+        with self._lock:
+            n = self._counters[service] = self._counters.get(service, 0) + 1
+        return random.Random(f"{self.seed}:{service}:{n}")
+
+    def config(self, service):
+        return self.profile[service]
+
+    def lognormal(self, rng, spec):
+        return spec["median"] * math.exp(spec.get("sigma", 0.0) * rng.gauss(0.0, 1.0))
+
+    def delay(self, seconds):
+        if seconds > 0 and self.scale > 0:
+            time.sleep(seconds * self.scale)
+
+    def pick_error(self, rng, service):
+        """Status code to fail this request with, or None"""
+        roll = rng.random()
+        for status, probability in self.config(service).get("errors", {}).items():
+            if roll < probability:
+                return int(status)
+            roll -= probability
+        return None
+
+    def count(self, service, key, amount=1):
+        with self._lock:
+            self._stats[service][key] += amount
+
+    def stats(self):
+        with self._lock:
+            return {
+                "seed": self.seed,
+                "scale": self.scale,
+                "services": copy.deepcopy(self._stats),
+            }
+
+
+def merge(base, override):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def parse_override(assignment):
+    """'groq.errors.503=0.05' -> {'groq': {'errors': {'503': 0.05}}}"""
+    path, _, raw = assignment.partition("=")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    for key in reversed(path.split(".")):
+        value = {key: value}
+    return value
+
+
+def tier_value(table, model):
+    """Entry of a {tier: value} table whose tier name occurs in model"""
+    model = (model or "").lower()
+    for tier in sorted(table, key=len, reverse=True):
+        if tier in model:
+            return table[tier]
+    return table[min(table, key=lambda t: table[t])]
+
+
+def fake_words(rng, count):
+    return [rng.choice(WORDS) for _ in range(max(1, count))]
+
+
+def audio_duration(data):
+    """Seconds of audio in an upload (exact for WAV, a guess otherwise)"""
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError):
+        return len(data) / COMPRESSED_BYTES_PER_SECOND
+
+
+def create_app(mock):
+    app = Flask(__name__)
+
+    def error_response(service, status):
+        mock.count(service, "errors")
+        response = jsonify({"error": {"message": f"Injected {status} from mock {service}", "type": "mock_error"}})
+        response.status_code = status
+        if status in (429, 503):
+            response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+        return response
+
+    def begin(service):
+        """Count the request, wait out its TTFB; returns (rng, error response or None)"""
+        mock.count(service, "requests")
+        rng = mock.rng(service)
+        ttfb = mock.lognormal(rng, mock.config(service)["ttfb"])
+        status = mock.pick_error(rng, service)
+        mock.count(service, "in_flight")
+        try:
+            mock.delay(ttfb)
+        finally:
+            mock.count(service, "in_flight", -1)
+        return rng, error_response(service, status) if status else None
+
+    def tracked(service, chunks):
+        """Count bytes and in-flight streams while the client reads them"""
+        mock.count(service, "in_flight")
+        try:
+            for chunk in chunks:
+                mock.count(service, "bytes", len(chunk))
+                yield chunk
+        finally:
+            mock.count(service, "in_flight", -1)
+
+    @app.route("/v1/audio/transcriptions", methods=["POST"])
+    def transcriptions():
+        rng, error = begin("whisper")
+        if error:
+            return error
+        config = mock.config("whisper")
+        upload = request.files.get("file")
+        data = upload.read() if upload else b""
+        model = request.form.get("model", "")
+        duration = audio_duration(data)
+        mock.delay(duration * tier_value(config["realtime_factor"], model))
+
+        words = fake_words(rng, int(duration * config["words_per_second"]))
+        text = " ".join(words).capitalize() + "."
+        response_format = request.form.get("response_format", "json")
+        if response_format == "text":
+            return Response(text, mimetype="text/plain")
+        if response_format != "verbose_json":
+            return jsonify({"text": text})
+
+        base_logprob = tier_value(config["avg_logprob"], model)
+        segments, per_segment = [], max(1, int(config["words_per_second"] * 5))
+        for i in range(0, len(words), per_segment):
+            start = round(duration * i / len(words), 2)
+            end = round(duration * min(len(words), i + per_segment) / len(words), 2)
+            segments.append({
+                "id": len(segments),
+                "start": start,
+                "end": end,
+                "text": " " + " ".join(words[i:i + per_segment]),
+                "avg_logprob": round(base_logprob + rng.gauss(0.0, 0.08), 3),
+                "compression_ratio": round(rng.uniform(1.1, 1.8), 3),
+                "no_speech_prob": round(rng.uniform(0.0, 0.1), 3),
+                "temperature": 0.0,
+            })
+        return jsonify({
+            "task": "transcribe",
+            "language": request.form.get("language") or "de",
+            "duration": round(duration, 2),
+            "text": text,
+            "segments": segments,
+        })
+
+    @app.route("/openai/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        rng, error = begin("groq")
+        if error:
+            return error
+        config = mock.config("groq")
+        body = request.get_json(silent=True) or {}
+        model = body.get("model", "mock")
+        prompt_tokens = sum(
+            math.ceil(len(str(m.get("content", ""))) / 4) for m in body.get("messages", [])
+        )
+        count = int(mock.lognormal(rng, config["reply_words"]))
+        if body.get("max_tokens"):
+            count = min(count, int(body["max_tokens"] / TOKENS_PER_WORD))
+        words = fake_words(rng, count)
+        completion_tokens = math.ceil(len(words) * TOKENS_PER_WORD)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            mock.delay(completion_tokens / config["tokens_per_second"])
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        abort_at = len(words) // 2 if rng.random() < config.get("abort_rate", 0.0) else None
+
+        def chunk(delta, finish_reason=None, **extra):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+        def generate():
+            yield chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                if i == abort_at:
+                    mock.count("groq", "aborted")
+                    return  # connection closes without [DONE]
+                mock.delay(TOKENS_PER_WORD / config["tokens_per_second"])
+                yield chunk({"content": word if i == 0 else f" {word}"})
+            yield chunk({}, "stop", x_groq={"id": completion_id, "usage": usage})
+            yield b"data: [DONE]\n\n"
+
+        return Response(tracked("groq", generate()), mimetype="text/event-stream")
+
+    @app.route("/v1/text-to-speech/<voice_id>/stream", methods=["POST"])
+    def text_to_speech_stream(voice_id):
+        rng, error = begin("elevenlabs")
+        if error:
+            return error
+        config = mock.config("elevenlabs")
+        text = (request.get_json(silent=True) or {}).get("text", "")
+        frames = max(1, int(len(text) * config["seconds_per_char"] / MP3_FRAME_SECONDS))
+        aborted = rng.random() < config.get("abort_rate", 0.0)
+        chunk_seconds = MP3_FRAMES_PER_CHUNK * MP3_FRAME_SECONDS / config["speed"]
+
+        def generate():
+            for sent in range(0, frames, MP3_FRAMES_PER_CHUNK):
+                if aborted and sent >= frames // 2:
+                    mock.count("elevenlabs", "aborted")
+                    return
+                if sent:
+                    mock.delay(chunk_seconds)
+                yield MP3_FRAME * min(MP3_FRAMES_PER_CHUNK, frames - sent)
+
+        return Response(tracked("elevenlabs", generate()), mimetype="audio/mpeg")
+
+    @app.route("/document/d/<doc_id>/export", methods=["GET"])
+    def docs_export(doc_id):
+        _, error = begin("docs")
+        if error:
+            return error
+        text = mock.config("docs")["text"]
+        response = Response(text, mimetype="text/plain")
+        response.set_etag(f"{doc_id}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}")
+        return response.make_conditional(request)
+
+    @app.route("/__mock/stats", methods=["GET"])
+    def stats():
+        return jsonify(mock.stats())
+
+    @app.route("/__mock/profile", methods=["GET", "PUT"])
+    def profile():
+        """Current profile; PUT merges a partial profile into it"""
+        if request.method == "PUT":
+            merge(mock.profile, request.get_json(force=True) or {})
+        return jsonify(mock.profile)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_PORT", 8090)))
+    parser.add_argument("--profile", help="JSON file merged over the default profile")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override one profile value, e.g. groq.ttfb.median=0.5")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every injected delay")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    profile = {}
+    if args.profile:
+        with open(args.profile, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    for assignment in args.set:
+        if not re.match(r"^[\w.]+=", assignment):
+            parser.error(f"--set expects KEY=VALUE, got {assignment!r}")
+        merge(profile, parse_override(assignment))
+
+    app = create_app(MockUpstream(profile, scale=args.scale, seed=args.seed))
+    print(f"Mock upstream on http://{args.host}:{args.port} "
+          f"({'gevent' if GEVENT_AVAILABLE else 'threaded'}, seed {args.seed}, scale {args.scale})")
+    if GEVENT_AVAILABLE:
+        WSGIServer((args.host, args.port), app, log=None).serve_forever()
+    else:
+        app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,25 @@ load_dotenv()
 from src.chat import chat_bp
 from src.transcribe_v2 import transcribe_bp  # import the voice chat blueprint
 from src.key_management import key_bp  # Add this line
+from src.voice_pipeline import voice_bp  # pipelined LLM -> TTS for calls
+from src.live_transcribe import socketio  # live partial transcripts over WebSocket
+from src.batch_jobs import batch_bp  # progress of resumable batch transcriptions
+from src.persona import persona_bp  # persona images and chat history
+from src.assets import init_assets  # fingerprinted, precompressed page assets
+from src.tracing import init_tracing  # per-stage spans and /metrics
+from src.admission import admission_bp  # per-upstream limits, 429/503 shedding
 
 app = Flask(__name__)
 app.register_blueprint(chat_bp)
 app.register_blueprint(transcribe_bp)  # register the voice chat blueprint
 app.register_blueprint(key_bp)  # Register the key management blueprint
+app.register_blueprint(voice_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(persona_bp)
+app.register_blueprint(admission_bp)
+init_assets(app)
+init_tracing(app)
+socketio.init_app(app)
 
 
 
@@ -57,4 +71,4 @@ def favicon():
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
-    app.run(debug=True, port=port)
+    socketio.run(app, debug=True, port=port)
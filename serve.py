@@ -0,0 +1,39 @@
+# serve.py
+"""Production entry point: one gevent process multiplexes all requests.
+
+Usage:
+    python serve.py                  # PORT (default 5000), HOST (default 0.0.0.0)
+
+Blocking calls in the blueprints (Groq, ElevenLabs, Google Docs and
+Whisper over httpx/requests, ffmpeg pipes, SSE and audio streams) yield
+to the gevent hub instead of holding an OS thread, so thousands of slow
+upstream calls and open streams share a single core. Run one process per
+core behind a sticky load balancer (Socket.IO needs sticky sessions).
+main.py stays the threaded development server.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+# Must be set before the app modules read their configuration
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+os.environ.setdefault("POOL_MAX_CONNECTIONS", "1000")
+os.environ.setdefault("POOL_MAX_KEEPALIVE", "200")
+
+import logging  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+from main import app, socketio  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", 5000))  # open client connections
+
+
+if __name__ == "__main__":
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", 5000))
+    logger.info(f"Serving on {host}:{port} (gevent, up to {MAX_CONNECTIONS} connections)")
+    socketio.run(app, host=host, port=port, spawn=Pool(MAX_CONNECTIONS), log_output=False)
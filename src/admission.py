@@ -0,0 +1,296 @@
+# admission.py
+import os
+import math
+import time
+import heapq
+import logging
+import itertools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from flask import Blueprint, jsonify, request
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+admission_bp = Blueprint("admission", __name__)
+
+# Priorities, lower runs first
+INTERACTIVE = 0  # call.html turns: someone is waiting on the line
+NORMAL = 1  # chat page requests
+BACKGROUND = 2  # summaries, batch jobs
+PRIORITY_NAMES = {"interactive": INTERACTIVE, "normal": NORMAL, "background": BACKGROUND}
+PRIORITY_LABELS = {level: name for name, level in PRIORITY_NAMES.items()}
+INTERACTIVE_BLUEPRINTS = {"voice"}  # /voice/turn is only used by call.html
+
+
+def _env_number(name, default):
+    return float(os.getenv(name, default))
+
+
+# Configuration
+# Per upstream: concurrent calls, sustained requests/second (0 = no rate limit) and burst
+UPSTREAM_LIMITS = {
+    "whisper": {
+        "max_concurrent": int(_env_number("WHISPER_MAX_CONCURRENT", 8)),
+        "rate": _env_number("WHISPER_RATE_LIMIT", 0),
+        "burst": int(_env_number("WHISPER_RATE_BURST", 10)),
+    },
+    "groq": {
+        "max_concurrent": int(_env_number("GROQ_MAX_CONCURRENT", 16)),
+        "rate": _env_number("GROQ_RATE_LIMIT", 0),
+        "burst": int(_env_number("GROQ_RATE_BURST", 20)),
+    },
+    "elevenlabs": {
+        "max_concurrent": int(_env_number("ELEVENLABS_MAX_CONCURRENT", 5)),
+        "rate": _env_number("ELEVENLABS_RATE_LIMIT", 0),
+        "burst": int(_env_number("ELEVENLABS_RATE_BURST", 10)),
+    },
+}
+ADMISSION_QUEUE_MAX = int(os.getenv("ADMISSION_QUEUE_MAX", 32))  # waiting calls per upstream
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10))  # seconds
+BACKGROUND_QUEUE_TIMEOUT = 60  # background work can wait longer, it has nobody waiting
+BACKGROUND_QUEUE_SHARE = 0.5  # background only queues while the queue is under half full
+HOLD_WINDOW = 200  # recent hold times kept for the Retry-After estimate
+
+ADMISSION_WAIT = "lovelingo_admission_wait_seconds"
+ADMISSION_REJECTED = "lovelingo_admission_rejected_total"
+ADMISSION_QUEUED = "lovelingo_admission_queued"
+tracer.metrics.describe(ADMISSION_WAIT, "histogram", "Time a call waited for an upstream slot")
+tracer.metrics.describe(ADMISSION_REJECTED, "counter", "Calls shed before reaching the upstream")
+tracer.metrics.describe(ADMISSION_QUEUED, "gauge", "Calls waiting for an upstream slot")
+
+_priority = contextvars.ContextVar("admission_priority", default=NORMAL)
+
+
+class AdmissionRejected(Exception):
+    """An upstream call was shed; status is 429 (rate) or 503 (capacity)"""
+
+    def __init__(self, upstream, reason, status, retry_after):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+        self.status = status
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(level):
+    """Run the block (e.g. a worker thread's job) at the given priority"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Classic token bucket; not locked itself, the limiter holds its lock"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now, needed=1):
+        """Seconds until `needed` tokens are available (0 without a rate limit)"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (needed - self.tokens) / self.rate)
+
+    def take(self):
+        if self.rate:
+            self.tokens -= 1
+
+
+class UpstreamLimiter:
+    """Concurrency limit plus token bucket for one upstream, with a bounded priority queue.
+
+    Calls start right away while a slot and a token are free; otherwise they
+    wait in priority order (then FIFO). A call is shed immediately, instead
+    of queueing, when the queue is full for its priority (503) or when the
+    rate limit alone would keep it waiting past its timeout (429).
+    """
+
+    def __init__(self, name, max_concurrent, rate=0, burst=10,
+                 queue_max=ADMISSION_QUEUE_MAX, queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.bucket = TokenBucket(rate, burst)
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._holds = deque(maxlen=HOLD_WINDOW)
+
+        self.running = 0
+        self.admitted = 0
+        self.rejected = {}
+        self._waits = deque(maxlen=HOLD_WINDOW)
+
+    # -- admission ----------------------------------------------------
+
+    def check(self, priority=None):
+        """Shed now if a call at this priority could not get a slot in time"""
+        priority = current_priority() if priority is None else priority
+        with self._cond:
+            self._shed(priority, time.monotonic(), block=True)
+
+    @contextmanager
+    def slot(self, priority=None, block=True):
+        """Hold one upstream slot for the block; raises AdmissionRejected"""
+        self.acquire(priority, block)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def acquire(self, priority=None, block=True):
+        priority = current_priority() if priority is None else priority
+        with self._cond:
+            now = time.monotonic()
+            if not self._waiters and self.running < self.max_concurrent and not self.bucket.wait_time(now):
+                self._admit(0.0)
+                return
+            self._shed(priority, now, block)
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            tracer.metrics.add_gauge(ADMISSION_QUEUED, 1, upstream=self.name)
+            deadline = now + self._timeout(priority)
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(priority, "queue timeout", 503, self._retry_after())
+                    if self._waiters[0] == entry and self.running < self.max_concurrent:
+                        token_wait = self.bucket.wait_time(time.monotonic())
+                        if not token_wait:
+                            break
+                        self._cond.wait(min(token_wait, remaining))
+                    else:
+                        self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                tracer.metrics.add_gauge(ADMISSION_QUEUED, -1, upstream=self.name)
+                self._cond.notify_all()  # the next head re-checks
+            self._admit(time.monotonic() - now)
+
+    def release(self, held):
+        with self._cond:
+            self.running -= 1
+            self._holds.append(held)
+            self._cond.notify_all()
+
+    def _admit(self, waited):
+        self.bucket.take()
+        self.running += 1
+        self.admitted += 1
+        self._waits.append(waited)
+        tracer.metrics.observe(ADMISSION_WAIT, waited, upstream=self.name)
+
+    def _shed(self, priority, now, block):
+        """Raise AdmissionRejected if queueing is pointless; caller holds the lock"""
+        if not block:
+            if self.running >= self.max_concurrent or self._waiters:
+                self._reject(priority, "no free slot", 503, self._retry_after())
+            return
+        limit = self.queue_max
+        if priority >= BACKGROUND:
+            limit = int(self.queue_max * BACKGROUND_QUEUE_SHARE)
+        if len(self._waiters) >= limit:
+            self._reject(priority, "queue full", 503, self._retry_after())
+        ahead = sum(1 for p, _ in self._waiters if p <= priority)
+        rate_wait = self.bucket.wait_time(now, needed=ahead + 1)
+        if rate_wait > self._timeout(priority):
+            self._reject(priority, "rate limited", 429, rate_wait)
+
+    def _reject(self, priority, reason, status, retry_after):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        tracer.metrics.inc(
+            ADMISSION_REJECTED, upstream=self.name, reason=reason,
+            priority=PRIORITY_LABELS.get(priority, "normal"),
+        )
+        raise AdmissionRejected(self.name, reason, status, retry_after)
+
+    def _timeout(self, priority):
+        return BACKGROUND_QUEUE_TIMEOUT if priority >= BACKGROUND else self.queue_timeout
+
+    def _retry_after(self):
+        # Time for the queue ahead to drain at the recent average hold time
+        holds = list(self._holds)
+        hold = sum(holds) / len(holds) if holds else 1.0
+        return hold * (len(self._waiters) + 1) / self.max_concurrent
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            by_priority = {name: 0 for name in PRIORITY_NAMES}
+            for priority, _ in self._waiters:
+                by_priority[PRIORITY_LABELS.get(priority, "normal")] += 1
+            return {
+                "max_concurrent": self.max_concurrent,
+                "rate_limit": self.bucket.rate or None,
+                "burst": self.bucket.burst if self.bucket.rate else None,
+                "queue_max": self.queue_max,
+                "running": self.running,
+                "waiting": by_priority,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "wait_ms_p50": _percentile_ms(waits, 0.50),
+                "wait_ms_p95": _percentile_ms(waits, 0.95),
+            }
+
+
+def _percentile_ms(values, q):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+
+# Global instances
+limiters = {name: UpstreamLimiter(name, **limits) for name, limits in UPSTREAM_LIMITS.items()}
+whisper_limiter = limiters["whisper"]
+groq_limiter = limiters["groq"]
+elevenlabs_limiter = limiters["elevenlabs"]
+
+
+def rejection_response(error):
+    response = jsonify({
+        "error": "Server busy" if error.status == 503 else "Too many requests",
+        "details": str(error),
+        "fix": f"Retry in {error.retry_after} seconds",
+    })
+    response.status_code = error.status
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+@admission_bp.app_errorhandler(AdmissionRejected)
+def handle_rejection(error):
+    return rejection_response(error)
+
+
+@admission_bp.before_app_request
+def set_request_priority():
+    """Priority from the route's blueprint only; clients can't ask for more"""
+    _priority.set(INTERACTIVE if request.blueprint in INTERACTIVE_BLUEPRINTS else NORMAL)
+
+
+@admission_bp.route("/api/admission/status", methods=["GET"])
+def admission_status():
+    return jsonify({name: limiter.stats() for name, limiter in limiters.items()})
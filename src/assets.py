@@ -0,0 +1,277 @@
+# assets.py
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from flask import Blueprint, request, send_file, jsonify
+from jinja2 import FileSystemLoader
+
+logger = logging.getLogger(__name__)
+
+# Optional: Brotli and real minifiers; gzip and a conservative CSS pass otherwise
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+try:
+    import rjsmin
+    import rcssmin
+    MINIFIERS_AVAILABLE = True
+except ImportError:
+    rjsmin = rcssmin = None
+    MINIFIERS_AVAILABLE = False
+
+assets_bp = Blueprint("assets", __name__)
+
+# Configuration
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+ASSET_DIR = os.getenv("ASSET_DIR", os.path.join(os.path.dirname(__file__), "asset_cache"))
+ASSETS_ENABLED = os.getenv("ASSETS_ENABLED", "1") != "0"
+INLINE_MAX_BYTES = 1024  # smaller blocks stay inline (a request costs more)
+ASSET_MAX_AGE = 365 * 24 * 3600  # fingerprinted, so safe to cache forever
+STATIC_MAX_AGE = 24 * 3600  # plain /static/ URLs can change in place
+HTML_COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE = {".js", ".css", ".svg", ".json", ".webmanifest", ".txt", ".ico"}
+MIMETYPES = {".js": "text/javascript", ".css": "text/css", ".webmanifest": "application/manifest+json"}
+
+INLINE_BLOCK = re.compile(r"<(script|style)(\s[^>]*)?>(.*?)</\1\s*>", re.S | re.I)
+CSS_RELATIVE_URL = re.compile(r"""url\(\s*(['"]?)(?![a-z]+:|/|#)([^'")]+)\1\s*\)""", re.I)
+
+
+def minify_css(css):
+    if MINIFIERS_AVAILABLE:
+        return rcssmin.cssmin(css)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    # Without rjsmin the script is kept as is; compression does most of the work
+    return rjsmin.jsmin(js) if MINIFIERS_AVAILABLE else js.strip()
+
+
+def compress(data):
+    """{encoding: bytes} for every encoding worth storing"""
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants["br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def pick_encoding(accept_encodings, available):
+    """Preferred stored encoding the client accepts (parsed header, q > 0)"""
+    for encoding in ("br", "gzip"):
+        if encoding in available and accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+class AssetStore:
+    """Fingerprinted files plus precompressed .br/.gz copies in ASSET_DIR"""
+
+    def __init__(self, directory=ASSET_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._static = {}  # static path -> (mtime, filename)
+
+    def add(self, data, name, ext):
+        """Store data once under name.<hash>.ext; returns the filename"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        filename = f"{name}.{digest}{ext}"
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            files = {path: data}
+            if ext in COMPRESSIBLE:
+                for encoding, blob in compress(data).items():
+                    files[f"{path}.{'br' if encoding == 'br' else 'gz'}"] = blob
+            with self._lock:
+                # Compressed copies first, so the plain file marks a complete set
+                for target in sorted(files, key=lambda p: p == path):
+                    tmp = f"{target}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(files[target])
+                    os.replace(tmp, target)
+        return filename
+
+    def static_filename(self, rel_path):
+        """Fingerprinted copy of a file under static/"""
+        source = os.path.join(STATIC_DIR, rel_path)
+        mtime = os.stat(source).st_mtime
+        cached = self._static.get(rel_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        stem, ext = os.path.splitext(rel_path.replace("/", "-"))
+        with open(source, "rb") as f:
+            filename = self.add(f.read(), stem, ext)
+        self._static[rel_path] = (mtime, filename)
+        return filename
+
+    def response(self, filename):
+        """Send a stored asset, precompressed if the client accepts it"""
+        if os.path.basename(filename) != filename:
+            return None
+        path = os.path.join(self.directory, filename)
+        if not os.path.isfile(path):
+            return None
+        ext = os.path.splitext(filename)[1]
+        available = {
+            "br": f"{path}.br",
+            "gzip": f"{path}.gz",
+        }
+        available = {k: v for k, v in available.items() if os.path.isfile(v)}
+        encoding = pick_encoding(request.accept_encodings, available)
+
+        response = send_file(
+            available[encoding] if encoding else path,
+            mimetype=MIMETYPES.get(ext) or _guess_mimetype(filename),
+            conditional=True,
+            etag=f"{filename}-{encoding or 'identity'}",
+            max_age=ASSET_MAX_AGE,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if ext in COMPRESSIBLE:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+def _guess_mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def extract_inline_assets(source, name, store):
+    """Move large inline <script>/<style> blocks into fingerprinted files.
+
+    Blocks with Jinja expressions, external scripts and small snippets stay
+    in the page. Extracted scripts keep their position and attributes, so
+    execution order does not change.
+    """
+    counter = {"script": 0, "style": 0}
+
+    def replace(match):
+        tag, attrs, body = match.group(1).lower(), match.group(2) or "", match.group(3)
+        if "{{" in body or "{%" in body or len(body.strip()) < INLINE_MAX_BYTES:
+            return match.group(0)
+        if tag == "script":
+            if "src=" in attrs.lower():
+                return match.group(0)
+            counter[tag] += 1
+            filename = store.add(minify_js(body), f"{name}-{counter[tag]}", ".js")
+            return f'<script{attrs} src="/assets/{filename}"></script>'
+        if attrs.strip():
+            return match.group(0)  # media queries etc. are left alone
+        counter[tag] += 1
+        # Pages live at the site root; keep relative url()s pointing there
+        css = CSS_RELATIVE_URL.sub(lambda m: f'url("/{m.group(2)}")', body)
+        filename = store.add(minify_css(css), f"{name}-{counter[tag]}", ".css")
+        return f'<link rel="stylesheet" href="/assets/{filename}">'
+
+    return INLINE_BLOCK.sub(replace, source)
+
+
+class FingerprintingLoader(FileSystemLoader):
+    """Template loader that serves the templates with inline assets extracted"""
+
+    def __init__(self, searchpath, store):
+        super().__init__(searchpath)
+        self.store = store
+        self._cache = {}  # template -> (mtime, transformed source)
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        if not template.endswith(".html"):
+            return source, filename, uptodate
+        mtime = os.path.getmtime(filename)
+        cached = self._cache.get(template)
+        if cached is None or cached[0] != mtime:
+            name = os.path.splitext(os.path.basename(template))[0]
+            transformed = extract_inline_assets(source, name, self.store)
+            logger.info(f"{template}: {len(source)} -> {len(transformed)} bytes of HTML")
+            cached = (mtime, transformed)
+            self._cache[template] = cached
+        return cached[1], filename, uptodate
+
+
+asset_store = AssetStore()
+
+
+@assets_bp.route("/assets/<filename>", methods=["GET"])
+def asset(filename):
+    """Fingerprinted asset, immutable and precompressed"""
+    response = asset_store.response(filename)
+    if response is None:
+        return jsonify({"error": "Unknown asset"}), 404
+    return response
+
+
+@assets_bp.app_context_processor
+def asset_helpers():
+    def asset_url(rel_path):
+        """Fingerprinted URL for a file under static/"""
+        try:
+            return f"/assets/{asset_store.static_filename(rel_path)}"
+        except OSError:
+            return f"/static/{rel_path}"
+
+    return {"asset_url": asset_url}
+
+
+@assets_bp.after_app_request
+def compress_html(response):
+    """Compress rendered pages on the fly (assets are precompressed)"""
+    if (
+        response.mimetype != "text/html"
+        or response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < HTML_COMPRESS_MIN_BYTES:
+        return response
+    encoding = pick_encoding(
+        request.accept_encodings,
+        {"br", "gzip"} if BROTLI_AVAILABLE else {"gzip"},
+    )
+    response.vary.add("Accept-Encoding")
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(data, compresslevel=6))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+@assets_bp.after_app_request
+def cache_static(response):
+    """Plain /static/ files get STATIC_MAX_AGE; every other route keeps its own caching"""
+    if request.endpoint == "static" and response.status_code in (200, 206, 304):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+    return response
+
+
+def init_assets(app):
+    """Serve templates with extracted assets and cache plain /static/ files"""
+    app.register_blueprint(assets_bp)
+    if ASSETS_ENABLED:
+        template_dir = os.path.join(app.root_path, app.template_folder)
+        app.jinja_loader = FingerprintingLoader(template_dir, asset_store)
@@ -0,0 +1,128 @@
+# audio_decode.py
+import io
+import wave
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Whisper input format
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2  # bytes, signed 16-bit little endian
+
+# Optional in-process decoders; ffmpeg stays the fallback when neither is present
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    av = None
+    PYAV_AVAILABLE = False
+
+try:
+    import numpy as np
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    np = None
+    sf = None
+    SOUNDFILE_AVAILABLE = False
+
+# Containers libsndfile can read (Opus-in-Ogg needs libsndfile >= 1.0.29)
+SOUNDFILE_FORMATS = {".wav", ".flac", ".ogg", ".mp3"}
+
+
+class DecodeError(Exception):
+    """Raised when in-process decoding is not possible for this input"""
+
+    pass
+
+
+def decoder_available(file_ext):
+    return PYAV_AVAILABLE or (SOUNDFILE_AVAILABLE and file_ext in SOUNDFILE_FORMATS)
+
+
+def decode_to_pcm(data, file_ext):
+    """Decode an encoded clip to 16 kHz mono s16le PCM bytes, in memory"""
+    if PYAV_AVAILABLE:
+        try:
+            return _decode_pyav(data)
+        except Exception as e:
+            logger.warning(f"PyAV decode failed for {file_ext}: {e}")
+    if SOUNDFILE_AVAILABLE and file_ext in SOUNDFILE_FORMATS:
+        try:
+            return _decode_soundfile(data)
+        except Exception as e:
+            logger.warning(f"soundfile decode failed for {file_ext}: {e}")
+    raise DecodeError(f"No in-process decoder could read {file_ext}")
+
+
+def _decode_pyav(data):
+    pcm = b"".join(iter_pcm(io.BytesIO(data)))
+    if not pcm:
+        raise DecodeError("Decoded audio is empty")
+    return pcm
+
+
+def iter_pcm(source):
+    """Yield 16 kHz mono s16le PCM blocks as PyAV decodes them.
+
+    source is any file-like object; it does not need to be seekable, so a
+    stream that is still being written (live recording) works too.
+    """
+    if not PYAV_AVAILABLE:
+        raise DecodeError("PyAV is not installed")
+
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+
+    def to_bytes(frames):
+        # pyav < 9 returns a single frame, newer versions a list
+        if frames is None:
+            return b""
+        if not isinstance(frames, list):
+            frames = [frames]
+        return b"".join(
+            bytes(frame.planes[0])[: frame.samples * SAMPLE_WIDTH] for frame in frames
+        )
+
+    with av.open(source, mode="r") as container:
+        if not container.streams.audio:
+            raise DecodeError("No audio stream in input")
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            frame.pts = None  # let the resampler handle WebM timestamp gaps
+            block = to_bytes(resampler.resample(frame))
+            if block:
+                yield block
+        block = to_bytes(resampler.resample(None))  # flush
+        if block:
+            yield block
+
+
+def _decode_soundfile(data):
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    mono = samples.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        # Linear interpolation is enough for speech going to Whisper
+        n_out = int(round(len(mono) * SAMPLE_RATE / rate))
+        positions = np.linspace(0, len(mono) - 1, n_out) if n_out else np.zeros(0)
+        mono = np.interp(positions, np.arange(len(mono)), mono)
+    if not len(mono):
+        raise DecodeError("Decoded audio is empty")
+    pcm = np.clip(mono * 32767.0, -32768, 32767).astype("<i2")
+    return pcm.tobytes()
+
+
+def pcm_to_wav(pcm, sample_rate=SAMPLE_RATE):
+    """Wrap raw PCM in a WAV header for upload"""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def pcm_duration(pcm, sample_rate=SAMPLE_RATE):
+    return len(pcm) / (SAMPLE_WIDTH * sample_rate)
+
@@ -0,0 +1,349 @@
+# batch_jobs.py
+"""Resumable batch transcription of long recordings.
+
+Usage:
+    python -m src.batch_jobs run static/lecture_recordings [--workers 8]
+    python -m src.batch_jobs status
+    python -m src.batch_jobs retry
+
+Every chunk's state is kept in SQLite, so an interrupted run picks up
+where it stopped and only pending or failed chunks are sent again.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Blueprint, jsonify
+from src.chunked_transcribe import (
+    CHUNK_SECONDS,
+    CHUNK_OVERLAP_SECONDS,
+    ChunkedTranscriber,
+    decode_file,
+    merge_chunks,
+    plan_chunks,
+)
+from src.audio_decode import pcm_duration
+from src.transcribe_v2 import client
+
+logger = logging.getLogger(__name__)
+
+batch_bp = Blueprint("batch", __name__)
+
+# Configuration
+BATCH_DB_PATH = os.getenv(
+    "BATCH_DB_PATH", os.path.join(os.path.dirname(__file__), "batch_jobs.sqlite3")
+)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 8))  # Whisper uploads across all files
+BATCH_FILE_CONCURRENCY = int(os.getenv("BATCH_FILE_CONCURRENCY", 2))  # files decoded at once
+BATCH_MAX_ATTEMPTS = 5  # per chunk, across runs
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".webm"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    output_path TEXT NOT NULL,
+    language TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    duration REAL,
+    chunk_seconds INTEGER NOT NULL,
+    overlap_seconds INTEGER NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    idx INTEGER NOT NULL,
+    start REAL NOT NULL,
+    length REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    text TEXT,
+    segments TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    """SQLite bookkeeping for jobs and their chunks (safe across threads)"""
+
+    def __init__(self, path=BATCH_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add_job(self, path, output_path, language=None,
+                chunk_seconds=CHUNK_SECONDS, overlap=CHUNK_OVERLAP_SECONDS):
+        """Register a file once; returns its job id"""
+        now = time.time()
+        self._execute(
+            "INSERT OR IGNORE INTO jobs (path, output_path, language, chunk_seconds,"
+            " overlap_seconds, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, output_path, language, chunk_seconds, overlap, now, now),
+        )
+        return self._execute("SELECT id FROM jobs WHERE path = ?", (path,))[0]["id"]
+
+    def job(self, job_id):
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(rows[0]) if rows else None
+
+    def unfinished_jobs(self):
+        return [dict(r) for r in self._execute(
+            "SELECT * FROM jobs WHERE status != 'done' ORDER BY id")]
+
+    def set_job(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def ensure_chunks(self, job_id, plan):
+        """Insert the chunk plan the first time a job is seen"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (job_id, idx, start, length, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(job_id, index, start, length, now) for start, length, index in plan],
+            )
+
+    def chunks(self, job_id, statuses=None):
+        sql = "SELECT * FROM chunks WHERE job_id = ?"
+        params = [job_id]
+        if statuses:
+            sql += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        return [dict(r) for r in self._execute(sql + " ORDER BY idx", params)]
+
+    def chunk_started(self, job_id, index):
+        self._execute(
+            "UPDATE chunks SET status = 'running', attempts = attempts + 1,"
+            " updated_at = ? WHERE job_id = ? AND idx = ?",
+            (time.time(), job_id, index),
+        )
+
+    def chunk_finished(self, job_id, result):
+        if result["error"]:
+            self._execute(
+                "UPDATE chunks SET status = 'failed', error = ?, updated_at = ?"
+                " WHERE job_id = ? AND idx = ?",
+                (result["error"], time.time(), job_id, result["index"]),
+            )
+            return
+        self._execute(
+            "UPDATE chunks SET status = 'done', text = ?, segments = ?, error = NULL,"
+            " updated_at = ? WHERE job_id = ? AND idx = ?",
+            (result["text"], json.dumps(result["segments"]), time.time(),
+             job_id, result["index"]),
+        )
+
+    def reset_failed(self):
+        """Give chunks that ran out of attempts another round"""
+        self._execute("UPDATE chunks SET attempts = 0 WHERE status = 'failed'")
+        self._execute("UPDATE jobs SET status = 'pending' WHERE status = 'incomplete'")
+
+    def progress(self):
+        jobs = self._execute(
+            "SELECT j.id, j.path, j.output_path, j.status, j.duration, j.error,"
+            " j.updated_at,"
+            " COUNT(c.idx) AS chunks,"
+            " SUM(c.status = 'done') AS done,"
+            " SUM(c.status = 'failed') AS failed,"
+            " SUM(c.status = 'running') AS running"
+            " FROM jobs j LEFT JOIN chunks c ON c.job_id = j.id"
+            " GROUP BY j.id ORDER BY j.id"
+        )
+        return [
+            {**dict(row), "done": row["done"] or 0, "failed": row["failed"] or 0,
+             "running": row["running"] or 0}
+            for row in jobs
+        ]
+
+
+class BatchRunner:
+    """Runs unfinished jobs; all files share one pool of Whisper workers"""
+
+    def __init__(self, store, transcriber, workers=BATCH_WORKERS,
+                 file_concurrency=BATCH_FILE_CONCURRENCY):
+        self.store = store
+        self.transcriber = transcriber
+        self.workers = workers
+        self.file_concurrency = file_concurrency
+
+    def run(self):
+        jobs = self.store.unfinished_jobs()
+        if not jobs:
+            logger.info("No unfinished batch jobs")
+            return
+        logger.info(f"Running {len(jobs)} job(s) on {self.workers} Whisper workers")
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="batch-chunk") as chunk_pool, \
+                ThreadPoolExecutor(max_workers=self.file_concurrency,
+                                   thread_name_prefix="batch-file") as file_pool:
+            futures = [file_pool.submit(self._run_job, job, chunk_pool) for job in jobs]
+            for future in futures:
+                future.result()
+
+    def _run_job(self, job, chunk_pool):
+        job_id = job["id"]
+        try:
+            self.store.set_job(job_id, status="running", error=None)
+            pcm = decode_file(job["path"])
+            duration = pcm_duration(pcm)
+            self.store.set_job(job_id, duration=round(duration, 2))
+            plan = plan_chunks(duration, job["chunk_seconds"], job["overlap_seconds"])
+            self.store.ensure_chunks(job_id, plan)
+            last_index = len(plan) - 1
+
+            todo = [
+                c for c in self.store.chunks(job_id, ("pending", "running", "failed"))
+                if c["attempts"] < BATCH_MAX_ATTEMPTS
+            ]
+            logger.info(f"{job['path']}: {len(todo)} of {len(plan)} chunks to transcribe")
+            futures = [
+                chunk_pool.submit(self._run_chunk, job, pcm, chunk, chunk["idx"] == last_index)
+                for chunk in todo
+            ]
+            wait(futures)
+            for future in futures:
+                future.result()
+            self._finalize(job, last_index)
+        except Exception as e:
+            logger.error(f"Batch job {job_id} ({job['path']}) failed: {e}")
+            self.store.set_job(job_id, status="failed", error=str(e))
+
+    def _run_chunk(self, job, pcm, chunk, last):
+        self.store.chunk_started(job["id"], chunk["idx"])
+        result = self.transcriber.transcribe_chunk(
+            pcm, chunk["start"], chunk["length"], chunk["idx"], last, job["language"]
+        )
+        self.store.chunk_finished(job["id"], result)
+
+    def _finalize(self, job, last_index):
+        chunks = self.store.chunks(job["id"])
+        if any(c["status"] != "done" for c in chunks):
+            failed = sum(c["status"] != "done" for c in chunks)
+            self.store.set_job(job["id"], status="incomplete",
+                               error=f"{failed} chunk(s) not transcribed")
+            return
+
+        results = [
+            {
+                "index": c["idx"],
+                "offset": c["start"],
+                "last": c["idx"] == last_index,
+                "text": c["text"] or "",
+                "segments": json.loads(c["segments"]) if c["segments"] else None,
+                "error": None,
+            }
+            for c in chunks
+        ]
+        text, _ = merge_chunks(results, job["chunk_seconds"])
+        os.makedirs(os.path.dirname(job["output_path"]) or ".", exist_ok=True)
+        with open(job["output_path"], "w", encoding="utf-8") as f:
+            f.write(text)
+        self.store.set_job(job["id"], status="done")
+        logger.info(f"Saved transcript: {job['output_path']}")
+
+
+def add_directory(store, audio_dir, language=None):
+    """Register every audio file in audio_dir; transcripts go to audio_dir/transcripts"""
+    transcript_dir = os.path.join(audio_dir, "transcripts")
+    added = 0
+    for fn in sorted(os.listdir(audio_dir)):
+        name, ext = os.path.splitext(fn)
+        if ext.lower() in AUDIO_EXTENSIONS:
+            store.add_job(os.path.abspath(os.path.join(audio_dir, fn)),
+                          os.path.abspath(os.path.join(transcript_dir, name + ".txt")),
+                          language)
+            added += 1
+    return added
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+        return _store
+
+
+@batch_bp.route("/api/batch/status", methods=["GET"])
+def batch_status():
+    """Progress of every batch job (chunks done / failed / running)"""
+    jobs = get_store().progress()
+    return jsonify({
+        "jobs": jobs,
+        "chunks": sum(j["chunks"] for j in jobs),
+        "done": sum(j["done"] for j in jobs),
+        "failed": sum(j["failed"] for j in jobs),
+    })
+
+
+@batch_bp.route("/api/batch/jobs/<int:job_id>", methods=["GET"])
+def batch_job(job_id):
+    """One job with its per-chunk state"""
+    store = get_store()
+    job = store.job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    job["chunks"] = [
+        {k: c[k] for k in ("idx", "start", "length", "status", "attempts", "error")}
+        for c in store.chunks(job_id)
+    ]
+    return jsonify(job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="add audio directories and process unfinished jobs")
+    run.add_argument("dirs", nargs="*")
+    run.add_argument("--language")
+    run.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    run.add_argument("--files", type=int, default=BATCH_FILE_CONCURRENCY)
+    sub.add_parser("status", help="print progress per job")
+    sub.add_parser("retry", help="reset failed chunks so the next run retries them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = get_store()
+
+    if args.command == "status":
+        for job in store.progress():
+            print(f"#{job['id']:<4} {job['status']:<10} {job['done']:>4}/{job['chunks']:<4}"
+                  f" failed={job['failed']:<3} {os.path.basename(job['path'])}")
+        return
+    if args.command == "retry":
+        store.reset_failed()
+        print("Failed chunks will be retried on the next run")
+        return
+
+    if client is None:
+        raise SystemExit("Whisper client not initialized")
+    for audio_dir in args.dirs:
+        print(f"Added {add_directory(store, audio_dir, args.language)} file(s) from {audio_dir}")
+    BatchRunner(store, ChunkedTranscriber(client), args.workers, args.files).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
 # chat_route.py
 import os
-from flask import Blueprint, request, Response, render_template
-from groq import Groq
-from elevenlabs.client import ElevenLabs
-import requests
-from src.key_management import get_groq_api_key, get_elevenlabs_api_key
+import io
+import json
+import uuid
+import logging
+from flask import Blueprint, request, Response, render_template, jsonify, send_file, url_for
+from src.client_registry import groq_clients, elevenlabs_clients, get_pool_stats
+from src.prompt_store import prompt_store
+from src.tts_cache import tts_cache, audio_key
+from src.llm_stream import CHAT_MODEL, stream_completion, stream_metrics
+from src.conversation_memory import conversation_memory
+from src.persona_registry import persona_registry
+from src.tracing import tracer
+from src.admission import groq_limiter, elevenlabs_limiter
 
 chat_bp = Blueprint("chat", __name__)
 
+logger = logging.getLogger(__name__)
+
 
 
 # GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -15,17 +25,25 @@ chat_bp = Blueprint("chat", __name__)
 # print("GROQ_API_KEY:", GROQ_API_KEY)
 # print(ELEVENLABS_API_KEY)
 
-GOOGLE_DOC_TXT_URL = "https://docs.google.com/document/d/1qz-3McunkpMIeKfoipANVMW4iZzZWHSVdAA1nhfa8lE/export?format=txt"
-
 def fetch_system_prompt():
-    try:
-        response = requests.get(GOOGLE_DOC_TXT_URL)
-        if response.status_code == 200:
-            return response.text.strip()
-        else:
-            return "Du bist ein Deutschlehrer."  # Fallback minimal prompt
-    except Exception:
-        return "Du bist ein Deutschlehrer."  # Fallback minimal prompt
+    """Return the cached system prompt (refreshed in the background)"""
+    return prompt_store.get()
+
+
+def get_system_prompt(data=None):
+    """Precompiled prompt of the requested persona, else the shared tutor prompt"""
+    name = (data or {}).get("persona") or request.args.get("persona")
+    if name:
+        persona = persona_registry.get(name)
+        if persona:
+            return persona.system_prompt
+        logger.warning(f"Unknown persona {name!r}, using the default prompt")
+    return fetch_system_prompt()
+
+
+@chat_bp.route("/api/system_prompt/status", methods=["GET"])
+def system_prompt_status():
+    return jsonify(prompt_store.stats())
 
 
 
@@ -33,39 +51,138 @@ def fetch_system_prompt():
 
 # eleven = ElevenLabs(api_key=ELEVENLABS_API_KEY)
 VOICE_ID = "nDJIICjR9zfJExIFeSCN"
+TTS_MODEL_ID = "eleven_multilingual_v2"
+TTS_AUDIO_MAX_AGE = 365 * 24 * 3600  # cached clips are content-addressed
+
+# /chat response modes: text -> JSON only, audio -> MP3 body, both -> multipart
+RESPONSE_MODES = {"text", "audio", "both"}
+ACCEPT_MODES = {
+    "audio/mpeg": "audio",
+    "application/json": "text",
+    "multipart/mixed": "both",
+}
 
 
 def get_groq():
-    return Groq(api_key=get_groq_api_key())
+    return groq_clients.get()
     
 def get_elevenlabs():
-    return ElevenLabs(api_key=get_elevenlabs_api_key())
+    return elevenlabs_clients.get()
+
+
+@chat_bp.route("/api/clients/status", methods=["GET"])
+def clients_status():
+    return jsonify(get_pool_stats())
 
 
 @chat_bp.route("/chat", methods=["GET"])
 def chat_get():
     return render_template("chat.html")
 
-# todo add cashing of audo files if same text is requested
+def get_session_id(data=None):
+    """Conversation session from the body, ?session_id= or X-Session-Id; new if absent"""
+    session_id = (
+        (data or {}).get("session_id")
+        or request.args.get("session_id")
+        or request.headers.get("X-Session-Id")
+    )
+    return session_id or conversation_memory.new_session_id()
+
+
+def stream_tts(text, **options):
+    """Yield MP3 chunks for text; synthesis starts on the first next()"""
+    with elevenlabs_limiter.slot(), tracer.span("tts_stream") as span:
+        audio_stream = get_elevenlabs().text_to_speech.stream(
+            text=text, voice_id=VOICE_ID, model_id=TTS_MODEL_ID, **options
+        )
+        for chunk in audio_stream:
+            if isinstance(chunk, bytes):
+                span.first_byte()
+                span.add_bytes(len(chunk))
+                yield chunk
+
+
+def get_response_mode():
+    """Pick the /chat response mode from ?mode= or the Accept header.
+
+    Defaults to "audio" so clients that only read the MP3 body keep working.
+    """
+    mode = request.args.get("mode", "").lower()
+    if mode in RESPONSE_MODES:
+        return mode
+    best = request.accept_mimetypes.best_match(list(ACCEPT_MODES), default="audio/mpeg")
+    return ACCEPT_MODES[best]
+
+
+def multipart_reply(reply):
+    """multipart/mixed body: a JSON part with the text, then the MP3 part"""
+    boundary = uuid.uuid4().hex
+
+    def generate():
+        yield (
+            f"--{boundary}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n\r\n"
+            + json.dumps({"reply": reply}, ensure_ascii=False)
+            + f"\r\n--{boundary}\r\n"
+            "Content-Type: audio/mpeg\r\n\r\n"
+        ).encode("utf-8")
+        yield from stream_tts(reply)
+        yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    headers = {"X-Reply-Text": reply.replace("\n", " ")}
+    return Response(
+        generate(), mimetype=f"multipart/mixed; boundary={boundary}", headers=headers
+    )
+
+
+def send_cached_audio(key, data):
+    """Serve a cached clip with ETag/304 and Range support"""
+    response = send_file(
+        io.BytesIO(data),
+        mimetype="audio/mpeg",
+        conditional=True,
+        etag=key,
+        max_age=TTS_AUDIO_MAX_AGE,
+    )
+    response.headers["X-Audio-Key"] = key
+    response.headers["Content-Location"] = url_for("chat.tts_audio", key=key)
+    response.cache_control.immutable = True
+    return response
+
+
 @chat_bp.route("/tts", methods=["POST"])
 def tts():
     data = request.get_json(silent=True) or {}
     text = data.get("text")
     if not text:
         return {"error": "Missing 'text' in JSON body."}, 400
-    
-    # Generate ElevenLabs TTS stream
-    audio_stream = get_elevenlabs().text_to_speech.stream(
-        text=text, voice_id=VOICE_ID, model_id="eleven_multilingual_v2"
-    )
 
-    def generate():
-        for chunk in audio_stream:
-            if isinstance(chunk, bytes):
-                yield chunk
+    key = audio_key(text, VOICE_ID, TTS_MODEL_ID)
+    audio, stream = tts_cache.get_or_stream(key, lambda: stream_tts(text))
+
+    if audio is not None:
+        response = send_cached_audio(key, audio)
+    else:
+        # Miss: stream while it is cached. No Content-Location yet, the
+        # clip only exists under /tts/<key> once this body has finished.
+        response = Response(stream, mimetype="audio/mpeg")
+        response.headers["X-Audio-Key"] = key
+    response.headers["X-Reply-Text"] = text.replace("\n", " ")
+    return response
+
+
+@chat_bp.route("/tts/<key>", methods=["GET"])
+def tts_audio(key):
+    """Replay a previously synthesized clip by its content key"""
+    audio = tts_cache.get(key)
+    if audio is None:
+        return {"error": "Audio not cached. POST the text to /tts first."}, 404
+    return send_cached_audio(key, audio)
 
-    headers = {"X-Reply-Text": text.replace("\n", " ")}
-    return Response(generate(), mimetype="audio/mpeg", headers=headers)
+
+@chat_bp.route("/api/tts_cache/status", methods=["GET"])
+def tts_cache_status():
+    return jsonify(tts_cache.stats())
 
 
 
@@ -76,23 +193,84 @@ def chat():
     if not user_msg:
         return {"error": "Missing 'message' in JSON body."}, 400
 
-    system_prompt = fetch_system_prompt()
+    mode = get_response_mode()
+    system_prompt = get_system_prompt(data)
+    session_id = get_session_id(data)
+    if mode != "text":
+        elevenlabs_limiter.check()  # don't spend an LLM call on a reply that can't be voiced
 
-    # 1️⃣ Send user message to Groq
-    resp = get_groq().chat.completions.create(
-        messages=[{"role":"system","content":system_prompt}, {"role": "user", "content": user_msg}], model="llama-3.3-70b-versatile"
-    )
+    # 1️⃣ Send user message (with the session's recent turns) to Groq
+    with groq_limiter.slot(), tracer.span("groq", model=CHAT_MODEL):
+        resp = get_groq().chat.completions.create(
+            messages=conversation_memory.build_messages(session_id, system_prompt, user_msg),
+            model=CHAT_MODEL,
+        )
     reply = resp.choices[0].message.content
+    conversation_memory.add_turn(session_id, user_msg, reply)
 
-    # 2️⃣ Generate ElevenLabs TTS stream
-    audio_stream = get_elevenlabs().text_to_speech.stream(
-        text=reply, voice_id=VOICE_ID, model_id="eleven_multilingual_v2"
-    )
+    # 2️⃣ Only synthesize speech if the client wants it
+    if mode == "text":
+        response = jsonify({"reply": reply, "session_id": session_id})
+    elif mode == "both":
+        response = multipart_reply(reply)
+    else:
+        headers = {"X-Reply-Text": reply.replace("\n", " ")}
+        response = Response(stream_tts(reply), mimetype="audio/mpeg", headers=headers)
+    response.headers["X-Session-Id"] = session_id
+    return response
+
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+@chat_bp.route("/chat/stream", methods=["GET", "POST"])
+def chat_stream():
+    """Stream the reply as SSE: token events, then a final 'done' event"""
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        user_msg = data.get("message")
+    else:
+        data = {}
+        user_msg = request.args.get("message")
+    if not user_msg:
+        return {"error": "Missing 'message'."}, 400
+
+    groq_limiter.check()  # 429/503 now rather than an error event mid-stream
+    session_id = get_session_id(data)
+    messages = conversation_memory.build_messages(session_id, get_system_prompt(data), user_msg)
 
     def generate():
-        for chunk in audio_stream:
-            if isinstance(chunk, bytes):
-                yield chunk
+        timings = {}
+        reply = []
+        try:
+            for delta in stream_completion(messages, timings):
+                reply.append(delta)
+                yield sse_event({"token": delta})
+        except Exception as e:
+            yield sse_event({"error": str(e)}, event="error")
+            return
+        reply = "".join(reply)
+        conversation_memory.add_turn(session_id, user_msg, reply)
+        yield sse_event({"reply": reply, "session_id": session_id, **timings}, event="done")
 
-    headers = {"X-Reply-Text": reply.replace("\n", " ")}
-    return Response(generate(), mimetype="audio/mpeg", headers=headers)
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        "X-Session-Id": session_id,
+    }
+    return Response(generate(), mimetype="text/event-stream", headers=headers)
+
+
+@chat_bp.route("/api/chat/stream/status", methods=["GET"])
+def chat_stream_status():
+    return jsonify(stream_metrics.stats())
+
+
+@chat_bp.route("/api/memory/status", methods=["GET"])
+def memory_status():
+    return jsonify(conversation_memory.stats())
@@ -0,0 +1,131 @@
+# chat_history.py
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CHAT_HISTORY_DB_PATH = os.getenv(
+    "CHAT_HISTORY_DB_PATH", os.path.join(os.path.dirname(__file__), "chat_history.sqlite3")
+)
+LEGACY_JSON_PATH = os.path.join(os.path.dirname(__file__), "chat_history.json")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+BUSY_TIMEOUT = 30  # seconds another process may hold the write lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    persona TEXT NOT NULL,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_persona_id ON messages (persona, id);
+"""
+
+
+class ChatHistoryStore:
+    """Append-only chat log in SQLite (WAL), indexed by persona.
+
+    Appends are a single INSERT and reads are an index range scan, so
+    neither depends on the size of the whole history. WAL mode lets
+    readers run while another worker process writes.
+    """
+
+    def __init__(self, path=CHAT_HISTORY_DB_PATH, legacy_json=LEGACY_JSON_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._import_legacy(legacy_json)
+
+    def _conn(self):
+        """One connection per thread (sqlite3 connections are not shared)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, persona, role, message, timestamp=None):
+        """Add one message; returns the stored entry"""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO messages (persona, role, message, timestamp, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (persona, role, message, timestamp, time.time()),
+            )
+        return {"id": cursor.lastrowid, "role": role, "message": message, "timestamp": timestamp}
+
+    def page(self, persona, before=None, limit=DEFAULT_PAGE_SIZE):
+        """Up to limit messages older than id `before` (newest page if None), oldest first"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql = "SELECT id, role, message, timestamp FROM messages WHERE persona = ?"
+        params = [persona]
+        if before is not None:
+            sql += " AND id < ?"
+            params.append(int(before))
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)  # one extra row tells whether older messages exist
+
+        rows = self._conn().execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        entries = [dict(r) for r in reversed(rows[:limit])]
+        return {
+            "history": entries,
+            "has_more": has_more,
+            "next_before": entries[0]["id"] if has_more and entries else None,
+        }
+
+    def _import_legacy(self, legacy_json):
+        """One-time import of the old whole-file chat_history.json"""
+        if not legacy_json or not os.path.exists(legacy_json):
+            return
+        try:
+            with open(legacy_json, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not import {legacy_json}: {e}")
+            return
+        if not isinstance(history, dict):
+            return
+
+        now = time.time()
+        rows = [
+            (persona, entry.get("role"), entry.get("message"), entry.get("timestamp"), now)
+            for persona, entries in history.items()
+            for entry in entries
+            if entry.get("role") and entry.get("message")
+        ]
+        conn = self._conn()
+        # Write lock first, so two workers starting together import only once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM messages LIMIT 1").fetchone():
+                conn.rollback()
+                return
+            conn.executemany(
+                "INSERT INTO messages (persona, role, message, timestamp, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info(f"Imported {len(rows)} messages from {legacy_json}")
+
+
+# Global instance
+chat_history = ChatHistoryStore()
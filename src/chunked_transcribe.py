@@ -0,0 +1,188 @@
+# chunked_transcribe.py
+import os
+import math
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.audio_decode import (
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    decoder_available,
+    decode_to_pcm,
+    pcm_to_wav,
+    pcm_duration,
+)
+from src.ffmpeg_pool import ffmpeg_pool
+from src.text_utils import merge_overlap
+from src.transcribe_v2 import client, MODEL
+from src.tracing import tracer
+from src.admission import BACKGROUND, whisper_limiter
+
+logger = logging.getLogger(__name__)
+
+# Configuration (chunking as in old/whisper_lectures_timed.py)
+CHUNK_SECONDS = int(os.getenv("CHUNK_SECONDS", 30))
+CHUNK_OVERLAP_SECONDS = int(os.getenv("CHUNK_OVERLAP_SECONDS", 5))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", 4))  # concurrent Whisper uploads
+CHUNK_TIMEOUT = 120  # seconds per chunk
+CHUNK_RETRIES = 1
+
+
+def plan_chunks(total_seconds, chunk_seconds=CHUNK_SECONDS, overlap=CHUNK_OVERLAP_SECONDS):
+    """(start, length, index) per chunk; every chunk but the ends is padded by overlap"""
+    n_chunks = max(1, math.ceil(total_seconds / chunk_seconds))
+    chunks = []
+    for i in range(n_chunks):
+        start = max(0, i * chunk_seconds - overlap)
+        end = min(total_seconds, (i + 1) * chunk_seconds + overlap)
+        chunks.append((start, end - start, i))
+    return chunks
+
+
+def slice_pcm(pcm, start, length):
+    """Cut [start, start + length) seconds out of a PCM buffer (no copy of the rest)"""
+    begin = int(start * SAMPLE_RATE) * SAMPLE_WIDTH
+    end = begin + int(length * SAMPLE_RATE) * SAMPLE_WIDTH
+    return memoryview(pcm)[begin:end]
+
+
+def decode_file(path):
+    """Whole file to PCM, in process when possible, else through the ffmpeg pool"""
+    with open(path, "rb") as f:
+        data = f.read()
+    file_ext = os.path.splitext(path)[1].lower()
+    if decoder_available(file_ext):
+        return decode_to_pcm(data, file_ext)
+    return ffmpeg_pool.convert(data)
+
+
+def _field(obj, name, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def merge_chunks(results, chunk_seconds=CHUNK_SECONDS):
+    """Join chunk transcripts into one, using segment timestamps.
+
+    Each chunk owns [i * chunk_seconds, (i + 1) * chunk_seconds); a segment
+    is kept only by the chunk whose owned range contains its midpoint, so
+    words spoken in an overlap are neither lost nor repeated. Chunks that
+    came back without segments fall back to word-overlap matching.
+    """
+    segments = []
+    text = ""
+    for result in sorted(results, key=lambda r: r["index"]):
+        if result.get("error"):
+            continue
+        owned_start = result["index"] * chunk_seconds
+        owned_end = owned_start + chunk_seconds
+        if result["segments"] is None:
+            text = merge_overlap(text, result["text"])
+            continue
+        for segment in result["segments"]:
+            start = result["offset"] + segment["start"]
+            end = result["offset"] + segment["end"]
+            midpoint = (start + end) / 2
+            if owned_start <= midpoint < owned_end or (
+                result["last"] and midpoint >= owned_end
+            ):
+                segments.append({"start": round(start, 2), "end": round(end, 2),
+                                 "text": segment["text"]})
+                text = f"{text} {segment['text']}".strip()
+    return text, segments
+
+
+class ChunkedTranscriber:
+    """Transcribes long recordings as overlapping chunks on a bounded pool"""
+
+    def __init__(self, client, model=MODEL, workers=CHUNK_WORKERS,
+                 chunk_seconds=CHUNK_SECONDS, overlap=CHUNK_OVERLAP_SECONDS):
+        self.client = client
+        self.model = model
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self.overlap = overlap
+
+    def transcribe_file(self, path, language=None):
+        """Decode once, then transcribe_pcm()"""
+        started = time.perf_counter()
+        pcm = decode_file(path)
+        decode_time = time.perf_counter() - started
+        result = self.transcribe_pcm(pcm, language)
+        result["decode_time"] = round(decode_time, 3)
+        return result
+
+    def transcribe_pcm(self, pcm, language=None):
+        """Transcribe 16 kHz mono s16le PCM of any length"""
+        duration = pcm_duration(pcm)
+        plan = plan_chunks(duration, self.chunk_seconds, self.overlap)
+        logger.info(f"Transcribing {duration:.0f}s as {len(plan)} chunks on {self.workers} workers")
+
+        started = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="whisper-chunk") as pool:
+            futures = [
+                pool.submit(self.transcribe_chunk, pcm, start, length, index,
+                            index == len(plan) - 1, language)
+                for start, length, index in plan
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+        elapsed = time.perf_counter() - started
+
+        text, segments = merge_chunks(results, self.chunk_seconds)
+        failed = sorted(r["index"] for r in results if r.get("error"))
+        return {
+            "text": text,
+            "segments": segments,
+            "duration": round(duration, 2),
+            "chunks": len(plan),
+            "failed_chunks": failed,
+            "workers": self.workers,
+            "elapsed": round(elapsed, 3),
+            "realtime_factor": round(duration / elapsed, 1) if elapsed else None,
+        }
+
+    def transcribe_chunk(self, pcm, start, length, index, last, language=None):
+        """One chunk upload (with retries); error is set when every attempt failed"""
+        wav = pcm_to_wav(slice_pcm(pcm, start, length))
+        result = {"index": index, "offset": start, "last": last,
+                  "text": "", "segments": None, "error": None}
+        options = {"language": language} if language else {}
+
+        for attempt in range(CHUNK_RETRIES + 1):
+            try:
+                with whisper_limiter.slot(BACKGROUND), tracer.span("whisper_chunk", model=self.model):
+                    response = self.client.audio.transcriptions.create(
+                        model=self.model,
+                        file=(f"chunk{index:04d}.wav", wav),
+                        response_format="verbose_json",
+                        timeout=CHUNK_TIMEOUT,
+                        **options,
+                    )
+                break
+            except Exception as e:
+                logger.warning(f"Chunk {index} attempt {attempt + 1} failed: {e}")
+                result["error"] = str(e)
+        else:
+            return result
+
+        result["error"] = None
+        result["text"] = (_field(response, "text") or "").strip()
+        raw_segments = _field(response, "segments")
+        if raw_segments:
+            result["segments"] = [
+                {
+                    "start": float(_field(s, "start", 0.0)),
+                    "end": float(_field(s, "end", 0.0)),
+                    "text": (_field(s, "text") or "").strip(),
+                }
+                for s in raw_segments
+            ]
+        return result
+
+
+# Global instance
+chunked_transcriber = ChunkedTranscriber(client) if client else None
@@ -0,0 +1,183 @@
+# client_registry.py
+import os
+import logging
+import threading
+import weakref
+import httpx
+from groq import Groq
+from elevenlabs.client import ElevenLabs
+from src.key_management import (
+    get_groq_api_key,
+    get_elevenlabs_api_key,
+    register_key_listener,
+)
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+POOL_MAX_CONNECTIONS = int(os.getenv("POOL_MAX_CONNECTIONS", 100))
+POOL_MAX_KEEPALIVE = int(os.getenv("POOL_MAX_KEEPALIVE", 20))
+POOL_KEEPALIVE_EXPIRY = 60  # seconds an idle connection is kept open
+UPSTREAM_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+RETIRE_GRACE_SECONDS = 120  # let in-flight streams finish before closing
+# Upstream overrides, e.g. benchmarks/mock_upstream.py (Groq also reads GROQ_BASE_URL itself)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL") or None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.info("h2 not installed, upstream clients use HTTP/1.1 keep-alive")
+
+
+class CountingTransport(httpx.HTTPTransport):
+    """httpx transport that records how often connections are reused"""
+
+    def __init__(self):
+        super().__init__(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._lock = threading.Lock()
+        self._seen = weakref.WeakSet()
+        self.requests = 0
+        self.handshakes = 0
+
+    def handle_request(self, request):
+        response = super().handle_request(request)
+        self._record()
+        return response
+
+    def _record(self):
+        connections = self._pool.connections
+        with self._lock:
+            self.requests += 1
+            for conn in connections:
+                if conn not in self._seen:
+                    self._seen.add(conn)
+                    self.handshakes += 1
+
+    def stats(self):
+        connections = self._pool.connections
+        with self._lock:
+            requests, handshakes = self.requests, self.handshakes
+        return {
+            "requests": requests,
+            "handshakes": handshakes,
+            "reuse_ratio": round(1 - handshakes / requests, 3) if requests else None,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+        }
+
+
+class _Entry:
+    def __init__(self, client, http_client, transport):
+        self.client = client
+        self.http_client = http_client
+        self.transport = transport
+
+
+class ClientRegistry:
+    """Long-lived SDK clients, one pooled httpx client per API key.
+
+    `get()` returns the client for the current key; when the key changes the
+    new client is built first and then swapped in with a single assignment,
+    while the old one is closed after a grace period.
+    """
+
+    def __init__(self, name, build_client, get_key):
+        self.name = name
+        self._build_client = build_client
+        self._get_key = get_key
+        self._lock = threading.Lock()
+        self._clients = {}  # api_key -> _Entry
+        self._current_key = None
+        self._retired = []  # stats of clients that were closed
+
+    def get(self):
+        """Return the pooled client for the current API key"""
+        api_key = self._get_key()
+        entry = self._clients.get(api_key)
+        if entry is None:
+            entry = self.swap(api_key)
+        return entry.client
+
+    def swap(self, api_key):
+        """Make api_key current, building its client if needed"""
+        with self._lock:
+            entry = self._clients.get(api_key)
+            if entry is None:
+                transport = CountingTransport()
+                http_client = httpx.Client(transport=transport, timeout=UPSTREAM_TIMEOUT)
+                entry = _Entry(self._build_client(api_key, http_client), http_client, transport)
+                self._clients[api_key] = entry
+                logger.info(f"{self.name}: new pooled client (http2={HTTP2_AVAILABLE})")
+
+            stale = [k for k in self._clients if k != api_key]
+            self._current_key = api_key
+
+        for old_key in stale:
+            timer = threading.Timer(RETIRE_GRACE_SECONDS, self._retire, args=(old_key,))
+            timer.daemon = True
+            timer.start()
+        return entry
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._clients.items())
+            current_key = self._current_key
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "clients": [
+                dict(entry.transport.stats(), current=key == current_key)
+                for key, entry in entries
+            ],
+            "retired": list(self._retired),
+        }
+
+    def _retire(self, api_key):
+        with self._lock:
+            if api_key == self._current_key:
+                return
+            entry = self._clients.pop(api_key, None)
+            if entry is None:
+                return
+            self._retired = (self._retired + [entry.transport.stats()])[-10:]
+        entry.http_client.close()
+        logger.info(f"{self.name}: closed client for rotated API key")
+
+
+groq_clients = ClientRegistry(
+    "groq",
+    lambda api_key, http_client: Groq(
+        api_key=api_key, http_client=http_client, base_url=GROQ_BASE_URL
+    ),
+    get_groq_api_key,
+)
+elevenlabs_clients = ClientRegistry(
+    "elevenlabs",
+    lambda api_key, http_client: ElevenLabs(
+        api_key=api_key, httpx_client=http_client, base_url=ELEVENLABS_BASE_URL
+    ),
+    get_elevenlabs_api_key,
+)
+
+
+def _on_key_change(provider, api_key):
+    if provider == "groq":
+        groq_clients.swap(api_key)
+    elif provider == "elevenlabs":
+        elevenlabs_clients.swap(api_key)
+
+
+register_key_listener(_on_key_change)
+
+
+def get_pool_stats():
+    return {"groq": groq_clients.stats(), "elevenlabs": elevenlabs_clients.stats()}
@@ -0,0 +1,234 @@
+# conversation_memory.py
+import os
+import math
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from src.client_registry import groq_clients
+from src.tracing import tracer
+from src.admission import BACKGROUND, groq_limiter
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", 3000))  # recent turns sent verbatim
+MEMORY_EVICT_TO = 0.75  # when over budget, evict down to this share of it
+MEMORY_MAX_PENDING_TOKENS = int(os.getenv("MEMORY_MAX_PENDING_TOKENS", 6000))  # unsummarized turns kept after a failed summary
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", "llama-3.1-8b-instant")
+MEMORY_SUMMARY_MAX_WORDS = 150
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", 1000))
+MEMORY_SESSION_TTL = 6 * 3600  # seconds of inactivity before a session is dropped
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a language-learning chat between a "
+    "learner and their tutor. Merge the new turns into the summary. Keep the "
+    "learner's name, level, goals, recurring mistakes and topics discussed. "
+    f"Answer with the updated summary only, at most {MEMORY_SUMMARY_MAX_WORDS} words."
+)
+
+_summary_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token), no tokenizer needed"""
+    return math.ceil(len(text) / 4) + MESSAGE_OVERHEAD_TOKENS
+
+
+class _Message:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.tokens = estimate_tokens(content)  # counted once, on append
+
+    def to_dict(self):
+        return {"role": self.role, "content": self.content}
+
+
+class Session:
+    """Rolling window of recent messages plus a summary of everything older.
+
+    window_tokens is kept as a running sum, so appending and building the
+    context only touch new or evicted messages, never the whole history.
+    Evicted turns wait verbatim for the summary and only the newest that
+    fit next to the window go into the context. If summaries keep failing,
+    the oldest waiting turns are dropped past MEMORY_MAX_PENDING_TOKENS.
+    """
+
+    def __init__(self, session_id):
+        self.id = session_id
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.window_tokens = 0
+        self.evicted = []  # out of the window, not yet in the summary
+        self.evicted_tokens = 0
+        self.in_summary = 0  # leading evicted messages the running summary call covers
+        self.summary = ""
+        self.summarizing = False
+        self.dropped = 0
+        self.turns = 0
+        self.summaries = 0
+        self.last_used = time.time()
+
+    def add(self, role, content):
+        message = _Message(role, content)
+        self.window.append(message)
+        self.window_tokens += message.tokens
+        if self.window_tokens > MEMORY_TOKEN_BUDGET:
+            target = MEMORY_TOKEN_BUDGET * MEMORY_EVICT_TO
+            # Always keep the latest exchange verbatim
+            while self.window_tokens > target and len(self.window) > 2:
+                old = self.window.popleft()
+                self.window_tokens -= old.tokens
+                self.evicted.append(old)
+                self.evicted_tokens += old.tokens
+
+    def trim_evicted(self):
+        """After a failed summary: drop the oldest waiting turns past MEMORY_MAX_PENDING_TOKENS"""
+        while (
+            len(self.evicted) > self.in_summary
+            and self.evicted_tokens > MEMORY_MAX_PENDING_TOKENS
+        ):
+            old = self.evicted.pop(self.in_summary)
+            self.evicted_tokens -= old.tokens
+            self.dropped += 1
+
+    def take_summarized(self):
+        """Forget the evicted turns the finished summary call covered"""
+        for old in self.evicted[:self.in_summary]:
+            self.evicted_tokens -= old.tokens
+        del self.evicted[:self.in_summary]
+        self.in_summary = 0
+
+    def context(self):
+        """Messages to put between the system prompt and the new user message"""
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {self.summary}",
+            })
+        # Evicted turns stay verbatim until the background summary covers
+        # them, newest first as long as they fit next to the window
+        room = MEMORY_TOKEN_BUDGET - self.window_tokens
+        start = len(self.evicted)
+        while start and self.evicted[start - 1].tokens <= room:
+            start -= 1
+            room -= self.evicted[start].tokens
+        messages.extend(m.to_dict() for m in self.evicted[start:])
+        messages.extend(m.to_dict() for m in self.window)
+        return messages
+
+
+class ConversationMemory:
+    """Per-session chat memory kept within a token budget"""
+
+    def __init__(self, max_sessions=MEMORY_MAX_SESSIONS, ttl=MEMORY_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.summary_failures = 0
+
+    @staticmethod
+    def new_session_id():
+        return uuid.uuid4().hex
+
+    def _session(self, session_id):
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.last_used > self.ttl:
+                session = Session(session_id)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_used = now
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def build_messages(self, session_id, system_prompt, user_msg):
+        """[system, (summary), recent turns..., user]"""
+        session = self._session(session_id)
+        with session.lock:
+            history = session.context()
+        return (
+            [{"role": "system", "content": system_prompt}]
+            + history
+            + [{"role": "user", "content": user_msg}]
+        )
+
+    def add_turn(self, session_id, user_msg, reply):
+        """Record a finished exchange; folds evicted turns into the summary in the background"""
+        session = self._session(session_id)
+        with session.lock:
+            session.add("user", user_msg)
+            session.add("assistant", reply)
+            session.turns += 1
+            if not session.evicted or session.summarizing:
+                return
+            session.summarizing = True
+        _summary_pool.submit(self._summarize, session)
+
+    def _summarize(self, session):
+        while True:
+            with session.lock:
+                batch = list(session.evicted)
+                session.in_summary = len(batch)
+                summary = session.summary
+                if not batch:
+                    session.summarizing = False
+                    return
+            turns = "\n".join(f"{m.role}: {m.content}" for m in batch)
+            try:
+                with groq_limiter.slot(BACKGROUND), tracer.span("groq_summary", model=MEMORY_SUMMARY_MODEL):
+                    response = groq_clients.get().chat.completions.create(
+                        model=MEMORY_SUMMARY_MODEL,
+                        messages=[
+                            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{turns}"},
+                        ],
+                        temperature=0.2,
+                    )
+                new_summary = (response.choices[0].message.content or "").strip()
+            except Exception as e:
+                # Turns stay in `evicted` (up to MEMORY_MAX_PENDING_TOKENS) and are retried after the next exchange
+                logger.warning(f"Summarizing session {session.id} failed: {e}")
+                with self._lock:
+                    self.summary_failures += 1
+                with session.lock:
+                    session.in_summary = 0
+                    session.trim_evicted()
+                    session.summarizing = False
+                return
+
+            with session.lock:
+                session.summary = new_summary
+                session.take_summarized()
+                session.summaries += 1
+
+    def stats(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "token_budget": MEMORY_TOKEN_BUDGET,
+            "max_pending_tokens": MEMORY_MAX_PENDING_TOKENS,
+            "summary_model": MEMORY_SUMMARY_MODEL,
+            "summaries": sum(s.summaries for s in sessions),
+            "summary_failures": self.summary_failures,
+            "pending_summary_messages": sum(len(s.evicted) for s in sessions),
+            "dropped_messages": sum(s.dropped for s in sessions),
+            "avg_window_tokens": round(
+                sum(s.window_tokens for s in sessions) / len(sessions), 1
+            ) if sessions else 0,
+        }
+
+
+# Global instance
+conversation_memory = ConversationMemory()
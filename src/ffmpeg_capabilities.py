@@ -0,0 +1,135 @@
+# ffmpeg_capabilities.py
+import os
+import time
+import logging
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+FFMPEG_REPROBE_INTERVAL = int(os.getenv("FFMPEG_REPROBE_INTERVAL", 600))  # seconds
+PROBE_TIMEOUT = 5  # seconds per ffmpeg invocation
+
+# Codecs and containers the conversion code cares about
+INTERESTING_ENCODERS = {"libmp3lame", "mp3", "libvorbis", "libopus", "pcm_s16le"}
+INTERESTING_DECODERS = {"opus", "libopus", "vorbis", "mp3", "aac", "flac", "pcm_s16le"}
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, timeout=PROBE_TIMEOUT, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-200:])
+    return result.stdout
+
+
+def _parse_codecs(output):
+    """Names from `ffmpeg -encoders`/`-decoders`, audio codecs only"""
+    names = set()
+    body = output.split(" ------", 1)[-1]
+    for line in body.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith("A"):
+            names.add(parts[1])
+    return names
+
+
+def _parse_formats(output):
+    """(demuxers, muxers) from `ffmpeg -formats`"""
+    demuxers, muxers = set(), set()
+    body = output.split("--", 1)[-1]
+    for line in body.splitlines():
+        parts = line.split()
+        flags = []
+        # Leading flag columns (D, E and, on newer builds, d for devices)
+        while parts and set(parts[0]) <= set("DEd") and len(parts) > 1:
+            flags.append(parts.pop(0))
+        if not parts or not flags:
+            continue
+        flags = "".join(flags)
+        for name in parts[0].split(","):
+            if "D" in flags:
+                demuxers.add(name)
+            if "E" in flags:
+                muxers.add(name)
+    return demuxers, muxers
+
+
+class FFmpegCapabilities:
+    """What the local ffmpeg can do, probed once and refreshed in the background"""
+
+    def __init__(self, reprobe_interval=FFMPEG_REPROBE_INTERVAL):
+        self.reprobe_interval = reprobe_interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self.available = False
+        self.version = None
+        self.encoders = set()
+        self.decoders = set()
+        self.demuxers = set()
+        self.muxers = set()
+        self.probed_at = None
+        self.error = None
+
+    def probe(self):
+        """Run the ffmpeg probes and replace the cached capabilities"""
+        try:
+            version = _run(["ffmpeg", "-hide_banner", "-version"]).splitlines()[0]
+            encoders = _parse_codecs(_run(["ffmpeg", "-hide_banner", "-encoders"]))
+            decoders = _parse_codecs(_run(["ffmpeg", "-hide_banner", "-decoders"]))
+            demuxers, muxers = _parse_formats(_run(["ffmpeg", "-hide_banner", "-formats"]))
+        except (OSError, subprocess.TimeoutExpired, RuntimeError) as e:
+            with self._lock:
+                self.available = False
+                self.error = str(e)
+                self.probed_at = time.time()
+            logger.warning(f"FFmpeg probe failed: {e}")
+            return False
+
+        with self._lock:
+            self.available = True
+            self.version = version
+            self.encoders = encoders
+            self.decoders = decoders
+            self.demuxers = demuxers
+            self.muxers = muxers
+            self.error = None
+            self.probed_at = time.time()
+        logger.info(
+            f"{version}; encoders: {sorted(encoders & INTERESTING_ENCODERS)}"
+        )
+        return True
+
+    def start(self):
+        """Probe now, then keep re-probing in a daemon thread"""
+        if self._thread is not None:
+            return
+        self.probe()
+        self._thread = threading.Thread(target=self._run, name="ffmpeg-probe", daemon=True)
+        self._thread.start()
+
+    def has_encoder(self, name):
+        with self._lock:
+            return name in self.encoders
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "available": self.available,
+                "version": self.version,
+                "encoders": sorted(self.encoders & INTERESTING_ENCODERS),
+                "decoders": sorted(self.decoders & INTERESTING_DECODERS),
+                "demuxers": sorted(self.demuxers),
+                "muxers": sorted(self.muxers),
+                "probed_at": self.probed_at,
+                "error": self.error,
+            }
+
+    def _run(self):
+        while True:
+            time.sleep(self.reprobe_interval)
+            self.probe()
+
+
+# Global instance, probed when the transcription blueprint is imported
+ffmpeg_capabilities = FFmpegCapabilities()
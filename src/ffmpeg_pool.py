@@ -0,0 +1,186 @@
+# ffmpeg_pool.py
+import os
+import time
+import queue
+import logging
+import threading
+import subprocess
+from collections import deque
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+FFMPEG_POOL_SIZE = int(os.getenv("FFMPEG_POOL_SIZE", max(1, (os.cpu_count() or 2) // 2)))
+FFMPEG_QUEUE_MAX = int(os.getenv("FFMPEG_QUEUE_MAX", 16))  # waiting jobs before 503
+FFMPEG_QUEUE_TIMEOUT = float(os.getenv("FFMPEG_QUEUE_TIMEOUT", 10))  # seconds
+FFMPEG_JOB_TIMEOUT = 30  # seconds
+TIMINGS_WINDOW = 200
+
+# Any supported container on stdin -> 16 kHz mono s16le PCM on stdout
+PCM_COMMAND = [
+    "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+    "-i", "pipe:0", "-vn", "-ar", "16000", "-ac", "1", "-f", "s16le", "pipe:1",
+]
+
+
+class PoolSaturated(Exception):
+    """All workers are busy and the wait queue is full (or timed out)"""
+
+    pass
+
+
+class FFmpegJobError(Exception):
+    """ffmpeg could not convert the input"""
+
+    pass
+
+
+class FFmpegPool:
+    """Bounded pool of pre-spawned ffmpeg processes fed over stdin/stdout.
+
+    Each process can only convert one input, but it is started ahead of time
+    and blocks on stdin, so process startup is paid off the request path.
+    A replacement is spawned in the background after every job.
+    """
+
+    def __init__(self, size=FFMPEG_POOL_SIZE, queue_max=FFMPEG_QUEUE_MAX,
+                 queue_timeout=FFMPEG_QUEUE_TIMEOUT, command=PCM_COMMAND):
+        self.size = size
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.command = command
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._spares = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+        self.waiting = 0
+        self.running = 0
+        self.jobs = 0
+        self.failures = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=TIMINGS_WINDOW)
+        self._runs = deque(maxlen=TIMINGS_WINDOW)
+
+    def start(self):
+        """Pre-spawn one warm process per slot"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._replenish()
+
+    def convert(self, data):
+        """Convert an encoded clip to PCM bytes; raises PoolSaturated when full"""
+        self.start()
+        queued_at = time.perf_counter()
+
+        with self._lock:
+            if self.waiting >= self.queue_max:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.waiting} conversions already queued")
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated(f"No ffmpeg worker free after {self.queue_timeout}s")
+
+        wait = time.perf_counter() - queued_at
+        with self._lock:
+            self.running += 1
+        try:
+            started = time.perf_counter()
+            with tracer.span("ffmpeg_convert", path="pool"):
+                pcm = self._run(data)
+            with self._lock:
+                self.jobs += 1
+                self._waits.append(wait)
+                self._runs.append(time.perf_counter() - started)
+            return pcm
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            runs = sorted(self._runs)
+            return {
+                "size": self.size,
+                "queue_max": self.queue_max,
+                "queue_depth": self.waiting,
+                "running": self.running,
+                "warm_spares": self._spares.qsize(),
+                "jobs": self.jobs,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "wait_ms_p50": _percentile_ms(waits, 0.50),
+                "wait_ms_p95": _percentile_ms(waits, 0.95),
+                "run_ms_p50": _percentile_ms(runs, 0.50),
+                "run_ms_p95": _percentile_ms(runs, 0.95),
+            }
+
+    def _run(self, data):
+        try:
+            proc = self._take_spare()
+        except OSError as e:
+            raise FFmpegJobError(f"Could not start ffmpeg: {e}")
+        threading.Thread(target=self._replenish, daemon=True).start()
+        try:
+            stdout, stderr = proc.communicate(input=data, timeout=FFMPEG_JOB_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise FFmpegJobError(f"ffmpeg timed out after {FFMPEG_JOB_TIMEOUT} seconds")
+        if proc.returncode != 0 or not stdout:
+            message = stderr.decode("utf-8", "replace").strip()[-500:]
+            raise FFmpegJobError(f"ffmpeg exited with {proc.returncode}: {message}")
+        return stdout
+
+    def _take_spare(self):
+        while True:
+            try:
+                proc = self._spares.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if proc.poll() is None:
+                return proc  # still waiting on stdin
+
+    def _spawn(self):
+        return subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def _replenish(self):
+        if self._spares.qsize() >= self.size:
+            return
+        try:
+            self._spares.put(self._spawn())
+        except OSError as e:
+            logger.warning(f"Could not pre-spawn ffmpeg worker: {e}")
+
+
+def _percentile_ms(values, q):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+
+# Global instance
+ffmpeg_pool = FFmpegPool()
@@ -0,0 +1,148 @@
+# image_variants.py
+import os
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = ImageOps = features = None
+    PIL_AVAILABLE = False
+    logger.info("Pillow not installed, persona images are served as the original PNG")
+
+# Configuration
+IMAGE_CACHE_DIR = os.getenv(
+    "IMAGE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "image_cache")
+)
+AVATAR_SIZES = (64, 128, 256, 512, 1024)  # square edge in px
+DEFAULT_AVATAR_SIZE = 256
+IMAGE_QUALITY = {"avif": 55, "webp": 80}
+IMAGE_MAX_AGE = 365 * 24 * 3600  # variant URLs are content-hashed
+
+# Preferred first; a format is only offered if this Pillow build can write it
+FORMAT_MIMETYPES = {"avif": "image/avif", "webp": "image/webp"}
+SUPPORTED_FORMATS = [
+    fmt for fmt in FORMAT_MIMETYPES if PIL_AVAILABLE and features.check(fmt)
+]
+
+
+def pick_size(requested):
+    """Smallest configured size that is at least the requested one"""
+    try:
+        requested = int(requested)
+    except (TypeError, ValueError):
+        return DEFAULT_AVATAR_SIZE
+    return next((s for s in AVATAR_SIZES if s >= requested), AVATAR_SIZES[-1])
+
+
+def negotiate_format(accept_mimetypes):
+    """Best variant format the client accepts, or None for the original"""
+    for fmt in SUPPORTED_FORMATS:
+        if FORMAT_MIMETYPES[fmt] in accept_mimetypes:
+            return fmt
+    return None
+
+
+class ImageVariants:
+    """Resized WebP/AVIF copies of source images, named by content hash.
+
+    A variant is generated on first request (or by warm()) and then served
+    straight from disk; its filename changes whenever the source changes.
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._digests = {}  # source path -> (mtime, size, digest)
+        self.generated = 0
+        self.failures = 0
+
+    def source_digest(self, source):
+        stat = os.stat(source)
+        cached = self._digests.get(source)
+        if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+            return cached[2]
+        with open(source, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._digests[source] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+    def variant(self, source, size, fmt):
+        """Filename of the size/fmt variant of source, generating it if needed"""
+        digest = self.source_digest(source)
+        params = f"{digest}:{size}:{fmt}:{IMAGE_QUALITY[fmt]}"
+        key = hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(source))[0]
+        filename = f"{stem}-{size}-{key}.{fmt}"
+        path = os.path.join(self.cache_dir, filename)
+        if os.path.exists(path):
+            return filename
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(filename, threading.Lock())
+        with key_lock:  # concurrent first requests render it once
+            if not os.path.exists(path):
+                self._render(source, path, size, fmt)
+        with self._lock:
+            self._key_locks.pop(filename, None)
+        return filename
+
+    def path_for(self, filename):
+        """Absolute path of a cached variant, or None"""
+        if os.path.basename(filename) != filename:
+            return None
+        path = os.path.join(self.cache_dir, filename)
+        return path if os.path.isfile(path) else None
+
+    def warm(self, sources, sizes=(DEFAULT_AVATAR_SIZE,)):
+        """Generate variants for sources in a background thread"""
+
+        def run():
+            for source in sources:
+                for size in sizes:
+                    for fmt in SUPPORTED_FORMATS:
+                        try:
+                            self.variant(source, size, fmt)
+                        except Exception as e:
+                            logger.warning(f"Could not pre-render {source} @{size} {fmt}: {e}")
+
+        if SUPPORTED_FORMATS:
+            threading.Thread(target=run, name="image-warm", daemon=True).start()
+
+    def stats(self):
+        files = os.listdir(self.cache_dir)
+        return {
+            "formats": SUPPORTED_FORMATS,
+            "sizes": list(AVATAR_SIZES),
+            "cached_variants": len(files),
+            "cached_bytes": sum(
+                os.path.getsize(os.path.join(self.cache_dir, f)) for f in files
+            ),
+            "generated": self.generated,
+            "failures": self.failures,
+        }
+
+    def _render(self, source, path, size, fmt):
+        try:
+            with Image.open(source) as img:
+                img = ImageOps.exif_transpose(img)
+                edge = min(size, img.width, img.height)  # never upscale
+                img = ImageOps.fit(img.convert("RGBA"), (edge, edge), Image.LANCZOS)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                img.save(tmp_path, format=fmt.upper(), quality=IMAGE_QUALITY[fmt])
+            os.replace(tmp_path, path)
+        except Exception:
+            self.failures += 1
+            raise
+        self.generated += 1
+        logger.info(f"Rendered {os.path.basename(path)} ({os.path.getsize(path)} bytes)")
+
+
+# Global instance
+image_variants = ImageVariants()
@@ -1,12 +1,31 @@
 import os
+import logging
 from flask import Blueprint, request, jsonify
 
+logger = logging.getLogger(__name__)
+
 key_bp = Blueprint("key_management", __name__)
 
 # Global variables to store API keys and clients
 _current_groq_key = os.getenv("GROQ_API_KEY")
 _current_elevenlabs_key = os.getenv("ELEVENLABS_API_KEY")
 
+# Callbacks notified as fn(provider, new_key) when a key is updated
+_key_listeners = []
+
+
+def register_key_listener(fn):
+    """Register a callback for API key changes"""
+    _key_listeners.append(fn)
+
+
+def _notify_key_change(provider, new_key):
+    for fn in _key_listeners:
+        try:
+            fn(provider, new_key)
+        except Exception:
+            logger.exception(f"Key listener failed for {provider}")
+
 
 def get_current_keys_half_hidden():
     """Get current API keys without revealing the actual keys"""
@@ -33,10 +52,12 @@ def update_keys():
     
     if groq_key:
         _current_groq_key = groq_key
+        _notify_key_change("groq", groq_key)
         updated = True
     
     if elevenlabs_key:
         _current_elevenlabs_key = elevenlabs_key
+        _notify_key_change("elevenlabs", elevenlabs_key)
         updated = True
     
     return jsonify({
@@ -0,0 +1,316 @@
+# live_transcribe.py
+import os
+import time
+import logging
+import threading
+import subprocess
+from flask import request
+from flask_socketio import SocketIO
+from src.audio_decode import (
+    PYAV_AVAILABLE,
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    iter_pcm,
+    pcm_to_wav,
+)
+from src.ffmpeg_pool import PCM_COMMAND
+from src.transcribe_v2 import transcriber, TranscriptionError
+from src.admission import AdmissionRejected
+from src.text_utils import merge_overlap
+
+logger = logging.getLogger(__name__)
+
+# Initialized against the app in main.py; serve.py switches to gevent.
+# Handlers run in arrival order per client, so audio chunks are never fed out of order.
+socketio = SocketIO(
+    async_mode=os.getenv("SOCKETIO_ASYNC_MODE", "threading"), async_handlers=False
+)
+
+NAMESPACE = "/live"
+
+# Configuration (same overlap-chunk idea as old/microphone_transcription_realtime.py)
+LIVE_CHUNK_SECONDS = 8  # audio committed per Whisper call while speaking
+LIVE_OVERLAP_SECONDS = 1  # context re-sent before each window
+LIVE_TICK_SECONDS = 1.0  # how often partials are refreshed
+LIVE_MIN_NEW_SECONDS = 0.75  # new audio needed before a partial is redone
+LIVE_MAX_SECONDS = 300  # hard cap per session
+DECODER_JOIN_TIMEOUT = 5  # seconds
+
+BYTES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH
+
+
+def _seconds_to_bytes(seconds):
+    return int(seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+
+
+class _ChunkFeed:
+    """Blocking file-like object fed with recorder chunks (not seekable)"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._buffer = bytearray()
+        self._closed = False
+
+    def write(self, data):
+        with self._cond:
+            self._buffer.extend(data)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def read(self, size=-1):
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self._closed)
+            if size is None or size < 0:
+                size = len(self._buffer)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+
+class StreamingDecoder:
+    """Decodes a growing WebM/Opus stream to PCM as the chunks arrive.
+
+    Uses PyAV on a blocking feed when available, otherwise a single ffmpeg
+    process fed over stdin for the whole recording.
+    """
+
+    def __init__(self, on_pcm):
+        self._on_pcm = on_pcm
+        self._feed = None
+        self._proc = None
+        self._threads = []
+        self.error = None
+
+        if PYAV_AVAILABLE:
+            self._feed = _ChunkFeed()
+            self._start_thread(self._decode_pyav)
+        else:
+            self._proc = subprocess.Popen(
+                PCM_COMMAND,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._start_thread(self._read_ffmpeg)
+
+    def write(self, data):
+        if self._feed is not None:
+            self._feed.write(data)
+        else:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+
+    def finish(self):
+        """Signal end of input and wait for the remaining PCM"""
+        if self._feed is not None:
+            self._feed.close()
+        else:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(DECODER_JOIN_TIMEOUT)
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+
+    def _start_thread(self, target):
+        thread = threading.Thread(target=target, name="live-decoder", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _decode_pyav(self):
+        try:
+            for block in iter_pcm(self._feed):
+                self._on_pcm(block)
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Live decode stopped: {e}")
+
+    def _read_ffmpeg(self):
+        while True:
+            block = self._proc.stdout.read(4096)
+            if not block:
+                break
+            self._on_pcm(block)
+
+
+class LiveSession:
+    """Buffers decoded PCM and keeps a running transcript for one recording"""
+
+    def __init__(self, sid, language=None):
+        self.sid = sid
+        self.language = language
+        self._lock = threading.Lock()
+        self._transcribe_lock = threading.Lock()  # one Whisper call at a time
+        self._pcm = bytearray()
+        self._committed_bytes = 0  # PCM covered by committed_text
+        self._partial_bytes = 0  # PCM covered by the last partial
+        self.committed_text = ""
+        self.partial_text = ""
+        self.whisper_calls = 0
+        self.active = True
+        self.decoder = StreamingDecoder(self._append_pcm)
+
+    def feed(self, chunk):
+        if not self.active:
+            return
+        if len(self._pcm) >= _seconds_to_bytes(LIVE_MAX_SECONDS):
+            return
+        self.decoder.write(chunk)
+
+    def run_ticks(self):
+        """Background loop: commit full windows and refresh the partial"""
+        while self.active:
+            socketio.sleep(LIVE_TICK_SECONDS)
+            if not self.active:
+                break
+            if self._transcribe_lock.locked():
+                continue  # previous call still running
+            with self._transcribe_lock:
+                changed = self._commit_ready_windows()
+                changed = self._refresh_partial() or changed
+            if changed and self.active:
+                socketio.emit(
+                    "partial",
+                    {"text": self.text(), "committed": self.committed_text},
+                    to=self.sid,
+                    namespace=NAMESPACE,
+                )
+
+    def finish(self):
+        """Stop the session and return the final transcript"""
+        stopped_at = time.perf_counter()
+        self.decoder.finish()
+        self.active = False
+        with self._transcribe_lock:
+            self._commit_ready_windows()
+            with self._lock:
+                pcm_len = len(self._pcm)
+            if pcm_len > self._committed_bytes:
+                if self._partial_bytes == pcm_len and self.partial_text:
+                    tail = self.partial_text  # already covers the whole tail
+                else:
+                    tail = self._transcribe_window(self._committed_bytes, pcm_len)
+                self.committed_text = merge_overlap(self.committed_text, tail)
+                self._committed_bytes = pcm_len
+            self.partial_text = ""
+
+        return {
+            "text": self.committed_text,
+            "duration": round(pcm_len / BYTES_PER_SECOND, 2),
+            "whisper_calls": self.whisper_calls,
+            "finalize_time": round(time.perf_counter() - stopped_at, 3),
+            "decode_error": self.decoder.error,
+        }
+
+    def text(self):
+        return merge_overlap(self.committed_text, self.partial_text)
+
+    def _append_pcm(self, block):
+        with self._lock:
+            self._pcm.extend(block)
+
+    def _commit_ready_windows(self):
+        chunk = _seconds_to_bytes(LIVE_CHUNK_SECONDS)
+        changed = False
+        while True:
+            with self._lock:
+                available = len(self._pcm)
+            if available - self._committed_bytes < chunk:
+                return changed
+            end = self._committed_bytes + chunk
+            text = self._transcribe_window(self._committed_bytes, end)
+            self.committed_text = merge_overlap(self.committed_text, text)
+            self._committed_bytes = end
+            # The partial no longer describes anything past the commit
+            self.partial_text = ""
+            self._partial_bytes = self._committed_bytes
+            changed = True
+
+    def _refresh_partial(self):
+        with self._lock:
+            available = len(self._pcm)
+        new_audio = available - max(self._partial_bytes, self._committed_bytes)
+        if new_audio < _seconds_to_bytes(LIVE_MIN_NEW_SECONDS):
+            return False
+        self.partial_text = self._transcribe_window(self._committed_bytes, available)
+        self._partial_bytes = available
+        return True
+
+    def _transcribe_window(self, start, end):
+        """Whisper on PCM[start - overlap : end]"""
+        start = max(0, start - _seconds_to_bytes(LIVE_OVERLAP_SECONDS))
+        with self._lock:
+            window = bytes(self._pcm[start:end])
+        if not window or transcriber is None:
+            return ""
+        self.whisper_calls += 1
+        try:
+            # Partials are redone every second; no slow-tier retries here
+            result = transcriber.transcribe_audio(
+                pcm_to_wav(window), self.language, escalate=False
+            )
+        except (TranscriptionError, AdmissionRejected) as e:
+            logger.info(f"Live window without transcript: {e}")
+            return ""
+        return result["text"]
+
+
+# Active sessions by Socket.IO sid
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _pop_session(sid):
+    with _sessions_lock:
+        return _sessions.pop(sid, None)
+
+
+@socketio.on("start", namespace=NAMESPACE)
+def on_start(data=None):
+    """Begin a live transcription session for this socket"""
+    data = data or {}
+    old = _pop_session(request.sid)
+    if old:
+        old.active = False
+        old.decoder.finish()
+
+    try:
+        session = LiveSession(request.sid, data.get("language"))
+    except OSError as e:
+        return {"error": "Live transcription unavailable", "details": str(e)}
+    with _sessions_lock:
+        _sessions[request.sid] = session
+    socketio.start_background_task(session.run_ticks)
+    return {"ready": True}
+
+
+@socketio.on("audio", namespace=NAMESPACE)
+def on_audio(chunk):
+    """One MediaRecorder chunk (binary)"""
+    with _sessions_lock:
+        session = _sessions.get(request.sid)
+    if session and isinstance(chunk, (bytes, bytearray)):
+        session.feed(bytes(chunk))
+
+
+@socketio.on("stop", namespace=NAMESPACE)
+def on_stop(data=None):
+    """Finish the recording; the final transcript is sent as the ack"""
+    session = _pop_session(request.sid)
+    if not session:
+        return {"error": "No live session"}
+    return session.finish()
+
+
+@socketio.on("disconnect", namespace=NAMESPACE)
+def on_disconnect(*args):
+    session = _pop_session(request.sid)
+    if session:
+        session.active = False
+        session.decoder.finish()
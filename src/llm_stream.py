@@ -0,0 +1,105 @@
+# llm_stream.py
+import time
+import threading
+from collections import deque
+from src.client_registry import groq_clients
+from src.tracing import tracer
+from src.admission import groq_limiter
+
+CHAT_MODEL = "llama-3.3-70b-versatile"
+METRICS_WINDOW = 200  # completions kept for the rolling stats
+
+
+class StreamMetrics:
+    """Rolling time-to-first-token and tokens/sec for streamed completions"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.total = 0
+        self.errors = 0
+
+    def record(self, ttft, tokens, duration):
+        tokens_per_sec = tokens / duration if duration > 0 else 0.0
+        with self._lock:
+            self._samples.append((ttft, tokens_per_sec))
+            self.total += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def stats(self):
+        with self._lock:
+            samples = list(self._samples)
+            total, errors = self.total, self.errors
+        ttfts = sorted(s[0] for s in samples if s[0] is not None)
+        rates = sorted(s[1] for s in samples)
+        return {
+            "completions": total,
+            "errors": errors,
+            "ttft_p50": _percentile(ttfts, 0.50),
+            "ttft_p95": _percentile(ttfts, 0.95),
+            "tokens_per_sec_p50": _percentile(rates, 0.50),
+        }
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+stream_metrics = StreamMetrics()
+
+
+def stream_completion(messages, timings=None):
+    """Yield text deltas from a streamed Groq completion.
+
+    If a dict is passed as timings it is filled with ttft, duration, tokens
+    and tokens_per_sec once the stream ends.
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    ttft = None
+    tokens = 0
+    usage_tokens = None
+
+    try:
+        with groq_limiter.slot(), tracer.span("groq_stream", model=CHAT_MODEL) as span:
+            stream = groq_clients.get().chat.completions.create(
+                messages=messages, model=CHAT_MODEL, stream=True
+            )
+            for chunk in stream:
+                # Groq reports exact usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                usage = getattr(x_groq, "usage", None) if x_groq else None
+                if usage is not None:
+                    usage_tokens = usage.completion_tokens
+
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                    span.first_byte()
+                span.add_bytes(len(delta.encode("utf-8")))
+                tokens += 1
+                yield delta
+    except Exception:
+        stream_metrics.record_error()
+        raise
+
+    duration = time.perf_counter() - start
+    tokens = usage_tokens or tokens
+    # Generation rate after the first token, so TTFT is not counted twice
+    generation_time = duration - (ttft or 0.0)
+    stream_metrics.record(ttft, tokens, generation_time)
+    timings.update(
+        ttft=round(ttft, 3) if ttft is not None else None,
+        duration=round(duration, 3),
+        tokens=tokens,
+        tokens_per_sec=round(tokens / generation_time, 1) if generation_time > 0 else None,
+    )
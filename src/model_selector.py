@@ -0,0 +1,213 @@
+# model_selector.py
+import os
+import math
+import time
+import random
+import difflib
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class WhisperModels:
+    TINY = "Systran/faster-whisper-tiny"
+    TINY_EN = "Systran/faster-whisper-tiny.en"
+    BASE = "Systran/faster-whisper-base"
+    BASE_EN = "Systran/faster-whisper-base.en"
+    SMALL = "Systran/faster-whisper-small"
+    SMALL_EN = "Systran/faster-whisper-small.en"
+    MEDIUM = "Systran/faster-whisper-medium"
+    MEDIUM_EN = "Systran/faster-whisper-medium.en"
+    LARGE_V2 = "Systran/faster-whisper-large-v2"
+    LARGE_V3 = "Systran/faster-whisper-large-v3"
+
+
+# Configuration
+# Fastest first; each step up is only taken when the previous result looks unreliable
+WHISPER_TIERS = [
+    m.strip()
+    for m in os.getenv(
+        "WHISPER_TIERS",
+        f"{WhisperModels.TINY},{WhisperModels.SMALL},{WhisperModels.LARGE_V3}",
+    ).split(",")
+    if m.strip()
+]
+SHORT_CLIP_SECONDS = 15  # voice notes up to this always start on the first tier
+LONG_CLIP_SECONDS = 60  # longer clips start one tier up (more context to get wrong)
+CONFIDENCE_THRESHOLD = float(os.getenv("WHISPER_CONFIDENCE_THRESHOLD", 0.6))
+LATENCY_BUDGET = float(os.getenv("WHISPER_LATENCY_BUDGET", 6.0))  # seconds per request
+MAX_ESCALATIONS = 1
+TIER_WINDOW = 200  # samples kept per tier for the report
+MIN_TIER_SAMPLES = 5  # before that a tier's latency is treated as unknown
+BUDGET_WINDOW_SECONDS = float(os.getenv("WHISPER_BUDGET_WINDOW", 300))  # latency samples older than this are ignored
+BUDGET_PROBE_RATE = 0.05  # share of calls still sent to an over-budget tier to see if it recovered
+
+# Whisper's own hallucination signals (same cut-offs as openai/whisper)
+COMPRESSION_RATIO_LIMIT = 2.4
+NO_SPEECH_LIMIT = 0.6
+
+
+def _field(obj, name, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def segment_confidence(response):
+    """Confidence in [0, 1] from verbose_json segments, or None without them.
+
+    Duration-weighted exp(avg_logprob); segments that repeat themselves
+    (high compression ratio) or are probably silence count as zero.
+    """
+    segments = _field(response, "segments") or []
+    total = weighted = 0.0
+    for segment in segments:
+        avg_logprob = _field(segment, "avg_logprob")
+        if avg_logprob is None:
+            continue
+        length = max(0.01, float(_field(segment, "end", 0)) - float(_field(segment, "start", 0)))
+        score = math.exp(min(0.0, float(avg_logprob)))
+        if (_field(segment, "compression_ratio") or 0) > COMPRESSION_RATIO_LIMIT:
+            score = 0.0
+        if (_field(segment, "no_speech_prob") or 0) > NO_SPEECH_LIMIT:
+            score = 0.0
+        total += length
+        weighted += score * length
+    return round(weighted / total, 3) if total else None
+
+
+def text_agreement(a, b):
+    """Word-level similarity of two transcripts (1.0 = identical)"""
+    return round(difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio(), 3)
+
+
+class _TierStats:
+    def __init__(self):
+        self.requests = 0
+        self.escalated = 0  # results of this tier that were sent one tier up
+        self.probes = 0  # calls let through while over budget
+        self.latencies = deque(maxlen=TIER_WINDOW)  # (monotonic time, seconds)
+        self.confidences = deque(maxlen=TIER_WINDOW)
+        self.agreements = deque(maxlen=TIER_WINDOW)  # vs. the next tier's text
+
+
+class ModelSelector:
+    """Chooses a Whisper model per clip and records the trade-off per tier"""
+
+    def __init__(self, tiers=None):
+        self.tiers = list(tiers or WHISPER_TIERS)
+        self._lock = threading.Lock()
+        self._stats = {model: _TierStats() for model in self.tiers}
+
+    def initial_model(self, duration=None):
+        """Tier to start on, from clip duration and current upstream latency"""
+        if duration is None or duration <= SHORT_CLIP_SECONDS or len(self.tiers) == 1:
+            return self.tiers[0]
+        if duration > LONG_CLIP_SECONDS and self._within_budget(self.tiers[1], probe=True):
+            return self.tiers[1]
+        return self.tiers[0]
+
+    def next_model(self, model, result, escalations):
+        """Model to retry with when result looks unreliable, else None"""
+        if escalations >= MAX_ESCALATIONS:
+            return None
+        if result.get("confidence_source") == "estimate":
+            return None  # no real signal to act on
+        confidence = result.get("confidence")
+        if confidence is None or confidence >= CONFIDENCE_THRESHOLD:
+            return None
+        index = self.tiers.index(model) if model in self.tiers else -1
+        if index + 1 >= len(self.tiers):
+            return None
+        candidate = self.tiers[index + 1]
+        if not self._within_budget(candidate, probe=True):
+            logger.info(f"Not escalating to {candidate}: upstream latency over budget")
+            return None
+        return candidate
+
+    def record(self, model, latency, confidence):
+        with self._lock:
+            stats = self._stats.setdefault(model, _TierStats())
+            stats.requests += 1
+            stats.latencies.append((time.monotonic(), latency))
+            if confidence is not None:
+                stats.confidences.append(confidence)
+
+    def record_escalation(self, model, text, better_text):
+        """Compare a tier's text with the next tier's (accuracy proxy)"""
+        with self._lock:
+            stats = self._stats.setdefault(model, _TierStats())
+            stats.escalated += 1
+            stats.agreements.append(text_agreement(text, better_text))
+
+    def _recent_latencies(self, model):
+        """Sorted latencies of the last BUDGET_WINDOW_SECONDS; caller holds the lock"""
+        stats = self._stats.get(model)
+        if stats is None:
+            return []
+        since = time.monotonic() - BUDGET_WINDOW_SECONDS
+        return sorted(latency for at, latency in stats.latencies if at >= since)
+
+    def _within_budget(self, model, probe=False):
+        """Median recent latency within LATENCY_BUDGET.
+
+        Only recent samples count, so a tier that was slow for a while is
+        retried once they age out. With probe=True a small share of calls
+        also goes through while over budget, so the window keeps getting
+        fresh samples instead of latching on the last bad ones.
+        """
+        with self._lock:
+            latencies = self._recent_latencies(model)
+            if len(latencies) < MIN_TIER_SAMPLES:
+                return True  # unknown: give it a try so the report fills up
+            if latencies[len(latencies) // 2] <= LATENCY_BUDGET:
+                return True
+            if probe and random.random() < BUDGET_PROBE_RATE:
+                self._stats[model].probes += 1
+                return True
+            return False
+
+    def report(self):
+        """Per tier: latency, confidence, escalation rate and agreement with the next tier"""
+        with self._lock:
+            stats = {model: self._stats[model] for model in self.tiers if model in self._stats}
+            tiers = []
+            for model, s in stats.items():
+                latencies = sorted(latency for _, latency in s.latencies)
+                tiers.append({
+                    "model": model,
+                    "requests": s.requests,
+                    "latency_p50": _percentile(latencies, 0.50),
+                    "latency_p95": _percentile(latencies, 0.95),
+                    "confidence_mean": _mean(s.confidences),
+                    "escalation_rate": round(s.escalated / s.requests, 3) if s.requests else None,
+                    "budget_probes": s.probes,
+                    "agreement_with_next": _mean(s.agreements),
+                    "within_budget": None,
+                })
+        for tier in tiers:
+            tier["within_budget"] = self._within_budget(tier["model"])
+        return {
+            "tiers": tiers,
+            "confidence_threshold": CONFIDENCE_THRESHOLD,
+            "latency_budget": LATENCY_BUDGET,
+            "budget_window_seconds": BUDGET_WINDOW_SECONDS,
+            "short_clip_seconds": SHORT_CLIP_SECONDS,
+            "long_clip_seconds": LONG_CLIP_SECONDS,
+        }
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 3) if values else None
+
+
+# Global instance
+model_selector = ModelSelector()
@@ -1,34 +1,26 @@
-from flask import Blueprint, request, jsonify, send_file, abort
+from flask import Blueprint, request, jsonify, send_file, abort, redirect, url_for
 import os
-import json
-from threading import Lock
+import logging
+from src.chat_history import chat_history, DEFAULT_PAGE_SIZE
+from src.persona_registry import persona_registry
+from src.image_variants import (
+    DEFAULT_AVATAR_SIZE,
+    FORMAT_MIMETYPES,
+    IMAGE_MAX_AGE,
+    SUPPORTED_FORMATS,
+    image_variants,
+    negotiate_format,
+    pick_size,
+)
+
+logger = logging.getLogger(__name__)
 
 persona_bp = Blueprint("persona", __name__)
 
-# Constants for file paths
-PERSONA_JSON_PATH = os.path.join(os.path.dirname(__file__), "personas.json")
-CHATHISTORY_JSON_PATH = os.path.join(os.path.dirname(__file__), "chat_history.json")
+PERSONA_REDIRECT_MAX_AGE = 3600  # the variant behind a persona name can change
 
-# Lock for thread-safe file writes
-file_lock = Lock()
-
-
-def _load_json(path):
-    """Helper to load JSON from file."""
-    if not os.path.exists(path):
-        return {}
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-
-
-def _write_json(path, data):
-    """Helper to write JSON to file in a thread-safe way."""
-    with file_lock:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+# Render the default avatar variants before the first page view
+image_variants.warm([p.image_path for p in persona_registry.all() if p.image_path])
 
 
 @persona_bp.route("/get_persona_image", methods=["GET"])
@@ -36,31 +28,93 @@ def get_persona_image():
     """
     Query Params:
       - name: persona name to fetch image for
-    Returns the image file for the given persona.
+      - size: wanted edge length in px (rounded up to a configured size)
+    Redirects to a resized WebP/AVIF variant if the client accepts one,
+    otherwise returns the original image file.
     """
     name = request.args.get("name")
     if not name:
         return jsonify({"error": "Missing persona name parameter"}), 400
 
-    personas = _load_json(PERSONA_JSON_PATH)
-    # Ensure personas is a list of dicts
-    if not isinstance(personas, list):
-        return jsonify({"error": "Invalid persona file format"}), 500
-
-    persona = next((p for p in personas if p.get("name") == name), None)
+    persona = persona_registry.get(name)
     if not persona:
         return jsonify({"error": "Persona not found"}), 404
 
-    image_path = persona.get("image")
-    if not image_path:
+    if not persona.image_path:
         return jsonify({"error": "Persona image not configured"}), 404
 
-    abs_path = os.path.join(os.path.dirname(__file__), image_path)
-    if not os.path.exists(abs_path):
+    if not os.path.exists(persona.image_path):
         return jsonify({"error": "Image file does not exist"}), 404
 
-    # Send the image file
-    return send_file(abs_path, mimetype="image/png")
+    # Redirect to a resized, content-hashed variant the browser can cache forever
+    fmt = negotiate_format(request.accept_mimetypes)
+    if fmt:
+        try:
+            filename = image_variants.variant(
+                persona.image_path, pick_size(request.args.get("size")), fmt
+            )
+        except Exception as e:
+            logger.warning(f"Image variant for {name} failed, sending original: {e}")
+        else:
+            response = redirect(url_for("persona.persona_image_variant", filename=filename))
+            response.cache_control.public = True
+            response.cache_control.max_age = PERSONA_REDIRECT_MAX_AGE
+            response.vary.add("Accept")
+            return response
+
+    # Send the original file
+    response = send_file(
+        persona.image_path,
+        conditional=True,
+        etag=image_variants.source_digest(persona.image_path),
+        max_age=PERSONA_REDIRECT_MAX_AGE,
+    )
+    response.vary.add("Accept")
+    return response
+
+
+@persona_bp.route("/persona_images/<filename>", methods=["GET"])
+def persona_image_variant(filename):
+    """A generated image variant; the name changes whenever the content does"""
+    path = image_variants.path_for(filename)
+    if not path:
+        return jsonify({"error": "Unknown image variant"}), 404
+    fmt = os.path.splitext(filename)[1].lstrip(".")
+    response = send_file(
+        path,
+        mimetype=FORMAT_MIMETYPES.get(fmt),
+        conditional=True,
+        etag=filename.rsplit("-", 1)[-1].split(".")[0],
+        max_age=IMAGE_MAX_AGE,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@persona_bp.app_context_processor
+def image_helpers():
+    def persona_image_url(name, size=DEFAULT_AVATAR_SIZE, fmt="webp"):
+        """Content-hashed variant URL for templates, or the negotiating endpoint"""
+        persona = persona_registry.get(name)
+        if persona and persona.image_path and fmt in SUPPORTED_FORMATS:
+            try:
+                filename = image_variants.variant(persona.image_path, pick_size(size), fmt)
+                return url_for("persona.persona_image_variant", filename=filename)
+            except Exception as e:
+                logger.warning(f"Image variant for {name} failed: {e}")
+        return url_for("persona.get_persona_image", name=name, size=size)
+
+    return {"persona_image_url": persona_image_url}
+
+
+@persona_bp.route("/api/personas", methods=["GET"])
+def list_personas():
+    """All personas (without image paths) and registry reload info"""
+    return jsonify({
+        "personas": [p.to_dict() for p in persona_registry.all()],
+        "registry": persona_registry.stats(),
+    })
 
 
 @persona_bp.route("/chat_history", methods=["GET"])
@@ -68,16 +122,21 @@ def get_persona_chat_history():
     """
     Query Params:
       - name: persona name whose chat history to fetch
-    Returns JSON array of messages for the persona.
+      - before: only messages with an id below this (for older pages)
+      - limit: page size (default 50, max 500)
+    Returns JSON array of messages for the persona, oldest first.
     """
     name = request.args.get("name")
     if not name:
         return jsonify({"error": "Missing persona name parameter"}), 400
 
-    history = _load_json(CHATHISTORY_JSON_PATH)
-    # history expected as dict: { persona_name: [ {role, message, timestamp}, ... ] }
-    persona_history = history.get(name, [])
-    return jsonify({"name": name, "history": persona_history})
+    before = request.args.get("before")
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE)
+    try:
+        page = chat_history.page(name, before=before, limit=limit)
+    except ValueError:
+        return jsonify({"error": "before and limit must be integers"}), 400
+    return jsonify({"name": name, **page})
 
 
 @persona_bp.route("/set_chat_hisotry", methods=["POST"])
@@ -87,7 +146,7 @@ def set_persona_chat_history():
       - name: persona name
       - role: 'user' or 'assistant'
       - message: text of the message
-    Appends a new entry to the chat history and returns updated history.
+    Appends a new entry to the chat history and returns the latest page.
     """
     data = request.get_json()
     if not data:
@@ -100,24 +159,10 @@ def set_persona_chat_history():
     if not all([name, role, message]):
         return jsonify({"error": "Missing one of name, role, or message"}), 400
 
-    history = _load_json(CHATHISTORY_JSON_PATH)
-    if not isinstance(history, dict):
-        history = {}
-
-    # Initialize list if new persona
-    persona_history = history.setdefault(name, [])
-
-    # Create entry with optional timestamp
-    entry = {
-        "role": role,
-        "message": message,
-        "timestamp": request.headers.get(
-            "X-Timestamp"
-        ),  # clients can include timestamp header
-    }
-
-    persona_history.append(entry)
-    # Write back to file
-    _write_json(CHATHISTORY_JSON_PATH, history)
-
-    return jsonify({"name": name, "history": persona_history}), 201
+    entry = chat_history.append(
+        name,
+        role,
+        message,
+        timestamp=request.headers.get("X-Timestamp"),  # clients can include timestamp header
+    )
+    return jsonify({"name": name, "entry": entry, **chat_history.page(name)}), 201
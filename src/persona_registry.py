@@ -0,0 +1,139 @@
+# persona_registry.py
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERSONAS_PATH = os.getenv("PERSONAS_PATH", os.path.join(ROOT_DIR, "personas.json"))
+PERSONA_IMAGE_DIR = os.path.join(ROOT_DIR, "static")  # "image" paths are relative to it
+PERSONA_CHECK_INTERVAL = 2.0  # seconds between mtime checks
+
+# Persona fields that go into the system prompt, in this order
+PROMPT_FIELDS = [
+    ("role", "Role"),
+    ("personality", "Personality"),
+    ("communication", "Communication style"),
+    ("interests", "Interests"),
+    ("boundaries", "Boundaries"),
+    ("goal", "Goal"),
+]
+
+
+def compile_prompt(persona):
+    """Ready-to-send system prompt for one persona entry"""
+    lines = [f"You are {persona.get('name', 'the assistant')}."]
+    for field, label in PROMPT_FIELDS:
+        value = (persona.get(field) or "").strip()
+        if value:
+            lines.append(f"{label}: {value}")
+    lines.append("Stay in character for the whole conversation.")
+    return "\n".join(lines)
+
+
+class Persona:
+    """One personas.json entry with its precompiled prompt and image path"""
+
+    def __init__(self, data):
+        if not isinstance(data, dict):
+            raise ValueError("expected an object")
+        for field in ["name", "image"] + [field for field, _ in PROMPT_FIELDS]:
+            value = data.get(field)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"'{field}' must be a string, not {type(value).__name__}")
+        self.name = data["name"]
+        self.data = data
+        self.system_prompt = compile_prompt(data)
+        image = data.get("image")
+        self.image_path = os.path.join(PERSONA_IMAGE_DIR, image) if image else None
+
+    def to_dict(self):
+        return {k: v for k, v in self.data.items() if k != "image"}
+
+
+class PersonaRegistry:
+    """personas.json indexed by name, reloaded only when the file changes"""
+
+    def __init__(self, path=PERSONAS_PATH, check_interval=PERSONA_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._personas = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self.reloads = 0
+        self.error = None
+        self.skipped = []  # entries left out of the last reload, with the reason
+        self._reload()
+
+    def get(self, name):
+        self._maybe_reload()
+        return self._personas.get(name)
+
+    def all(self):
+        self._maybe_reload()
+        return list(self._personas.values())
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "personas": sorted(self._personas),
+            "mtime": self._mtime,
+            "reloads": self.reloads,
+            "error": self.error,
+            "skipped": self.skipped,
+        }
+
+    def _maybe_reload(self):
+        # At most one stat() per interval, whatever the request rate
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return  # keep serving what was loaded last
+        if mtime != self._mtime:
+            self._reload()
+
+    def _reload(self):
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+                if not isinstance(entries, list):
+                    raise ValueError("expected a list of personas")
+            except (OSError, ValueError) as e:
+                # A half-written or broken file must not drop the loaded personas
+                self.error = str(e)
+                logger.warning(f"Could not load personas from {self.path}: {e}")
+                return
+            personas, skipped = {}, []
+            for i, entry in enumerate(entries):
+                # One bad entry is skipped instead of failing the whole file
+                try:
+                    if not (isinstance(entry, dict) and entry.get("name")):
+                        raise ValueError("missing 'name'")
+                    persona = Persona(entry)
+                except ValueError as e:
+                    label = entry.get("name") if isinstance(entry, dict) else None
+                    skipped.append(f"{label if isinstance(label, str) else f'entry {i}'}: {e}")
+                    logger.warning(f"Skipping persona {skipped[-1]} in {self.path}")
+                    continue
+                personas[persona.name] = persona
+            self._personas = personas
+            self.skipped = skipped
+            self._mtime = mtime
+            self.error = None
+            self.reloads += 1
+        logger.info(f"Loaded {len(personas)} persona(s) from {self.path}")
+
+
+# Global instance
+persona_registry = PersonaRegistry()
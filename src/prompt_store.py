@@ -0,0 +1,219 @@
+# prompt_store.py
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+GOOGLE_DOC_TXT_URL = os.getenv(
+    "SYSTEM_PROMPT_URL",
+    "https://docs.google.com/document/d/1qz-3McunkpMIeKfoipANVMW4iZzZWHSVdAA1nhfa8lE/export?format=txt",
+)
+FALLBACK_PROMPT = "Du bist ein Deutschlehrer."  # Fallback minimal prompt
+PROMPT_TTL = int(os.getenv("PROMPT_TTL", 300))  # seconds before a refresh is due
+PROMPT_FETCH_TIMEOUT = 5  # seconds
+PROMPT_SNAPSHOT_PATH = os.getenv(
+    "PROMPT_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(__file__), "system_prompt_snapshot.json"),
+)
+
+
+class PromptStore:
+    """TTL cache for the system prompt with stale-while-revalidate.
+
+    `get()` never touches the network: it returns the last known prompt and,
+    when that prompt is older than the TTL, wakes the background refresher.
+    """
+
+    def __init__(self, url, ttl=PROMPT_TTL, snapshot_path=PROMPT_SNAPSHOT_PATH,
+                 fallback=FALLBACK_PROMPT, timeout=PROMPT_FETCH_TIMEOUT):
+        self.url = url
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.fallback = fallback
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._refreshing = False  # a fetch is running or about to; no need to wake
+        self._session = requests.Session()
+
+        self._text = None
+        self._etag = None
+        self._last_modified = None
+        self._validated_at = None  # time.time() of last 200/304 (or snapshot write)
+        self._source = "fallback"
+        self._refresh_count = 0
+        self._not_modified_count = 0
+        self._failure_count = 0
+        self._last_error = None
+
+        self._load_snapshot()
+
+    # -- public API ---------------------------------------------------
+
+    def get(self):
+        """Return the current prompt without blocking on the network"""
+        self.start()
+        with self._lock:
+            text = self._text
+            stale = self._validated_at is None or time.time() - self._validated_at > self.ttl
+            wake = stale and not self._refreshing
+        if wake:
+            self._wake.set()
+        return text or self.fallback
+
+    def age(self):
+        """Seconds since the prompt was last confirmed fresh, or None"""
+        with self._lock:
+            if self._validated_at is None:
+                return None
+            return time.time() - self._validated_at
+
+    def stats(self):
+        """Snapshot of the store state for the status endpoint"""
+        age = self.age()
+        with self._lock:
+            return {
+                "source": self._source,
+                "age_seconds": round(age, 1) if age is not None else None,
+                "ttl_seconds": self.ttl,
+                "stale": age is None or age > self.ttl,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "refresh_count": self._refresh_count,
+                "not_modified_count": self._not_modified_count,
+                "failure_count": self._failure_count,
+                "last_error": self._last_error,
+                "length": len(self._text) if self._text else 0,
+            }
+
+    def start(self):
+        """Start the background refresher thread once"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            # The thread fetches right away: a cold start makes one request
+            self._refreshing = True
+            self._thread = threading.Thread(
+                target=self._run, name="prompt-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def refresh(self):
+        """Conditionally re-fetch the prompt; returns True if it changed"""
+        headers = {}
+        with self._lock:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+        try:
+            with tracer.span("prompt_fetch") as span:
+                response = self._session.get(self.url, headers=headers, timeout=self.timeout)
+                if response.status_code not in (200, 304):
+                    span.fail(f"http_{response.status_code}")
+        except Exception as e:
+            self._record_failure(str(e))
+            return False
+
+        if response.status_code == 304:
+            with self._lock:
+                self._validated_at = time.time()
+                self._not_modified_count += 1
+                self._last_error = None
+            return False
+
+        if response.status_code != 200:
+            self._record_failure(f"HTTP {response.status_code}")
+            return False
+
+        text = response.text.strip()
+        if not text:
+            self._record_failure("empty prompt document")
+            return False
+
+        with self._lock:
+            changed = text != self._text
+            self._text = text
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            self._validated_at = time.time()
+            self._source = "remote"
+            self._refresh_count += 1
+            self._last_error = None
+
+        if changed:
+            logger.info(f"System prompt refreshed ({len(text)} chars)")
+            self._write_snapshot()
+        return changed
+
+    # -- internals ----------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._refreshing = True
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+            # Sleep until the TTL runs out or a request finds the prompt stale
+            self._wake.wait(self.ttl)
+            self._wake.clear()
+
+    def _record_failure(self, error):
+        logger.warning(f"System prompt refresh failed: {error}")
+        with self._lock:
+            self._failure_count += 1
+            self._last_error = error
+
+    def _load_snapshot(self):
+        """Seed the cache from disk so cold starts have a real prompt"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable prompt snapshot: {e}")
+            return
+
+        self._text = snapshot.get("text") or None
+        self._etag = snapshot.get("etag")
+        self._last_modified = snapshot.get("last_modified")
+        # The snapshot may be old; leave _validated_at unset so the first
+        # get() schedules a revalidation straight away.
+        self._source = "snapshot" if self._text else "fallback"
+
+    def _write_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            snapshot = {
+                "text": self._text,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "fetched_at": self._validated_at,
+            }
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write prompt snapshot: {e}")
+
+
+# Global instance
+prompt_store = PromptStore(GOOGLE_DOC_TXT_URL)
@@ -0,0 +1,23 @@
+# text_utils.py
+import re
+
+
+def _normalize(word):
+    return re.sub(r"\W+", "", word.lower())
+
+
+def merge_overlap(left, right, max_words=12):
+    """Join two transcripts whose audio overlapped, dropping repeated words"""
+    left_words, right_words = left.split(), right.split()
+    if not left_words:
+        return right.strip()
+    if not right_words:
+        return left.strip()
+
+    for size in range(min(max_words, len(left_words), len(right_words)), 0, -1):
+        tail = [_normalize(w) for w in left_words[-size:]]
+        head = [_normalize(w) for w in right_words[:size]]
+        if tail == head and any(tail):
+            right_words = right_words[size:]
+            break
+    return " ".join(left_words + right_words)
@@ -0,0 +1,232 @@
+# tracing.py
+import os
+import time
+import logging
+import threading
+from flask import Blueprint, Response, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# Configuration
+METRICS_PREFIX = "lovelingo"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TRACE_SLOW_SECONDS = float(os.getenv("TRACE_SLOW_SECONDS", 5.0))  # log the spans of slower requests
+SERVER_TIMING_MAX_SPANS = 20
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by (name, labels), in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_gauge(self, name, amount, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def render(self):
+        with self._lock:
+            series = {}
+            for (name, labels), value in self._counters.items():
+                series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), value in self._gauges.items():
+                series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), h in self._histograms.items():
+                lines = series.setdefault(name, [])
+                for bound, count in zip(LATENCY_BUCKETS, h.counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {round(h.sum, 6)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+
+        out = []
+        for name in sorted(series):
+            kind, text = self._help.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(sorted(series[name]))
+        return "\n".join(out) + "\n"
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+STAGE_DURATION = f"{METRICS_PREFIX}_stage_duration_seconds"
+STAGE_FIRST_BYTE = f"{METRICS_PREFIX}_stage_first_byte_seconds"
+STAGE_IN_FLIGHT = f"{METRICS_PREFIX}_stage_in_flight"
+STAGE_BYTES = f"{METRICS_PREFIX}_stage_bytes_total"
+UPSTREAM_ERRORS = f"{METRICS_PREFIX}_upstream_errors_total"
+REQUEST_DURATION = f"{METRICS_PREFIX}_http_request_duration_seconds"
+REQUESTS_IN_FLIGHT = f"{METRICS_PREFIX}_http_requests_in_flight"
+
+
+class Span:
+    """One timed stage; use via tracer.span()"""
+
+    def __init__(self, tracer, stage, labels):
+        self.tracer = tracer
+        self.stage = stage
+        self.labels = labels
+        self.outcome = "ok"
+        self.error = None
+        self.duration = None
+        self._start = None
+        self._first_byte = False
+
+    def first_byte(self):
+        """Mark the first streamed chunk (recorded once)"""
+        if not self._first_byte:
+            self._first_byte = True
+            self.tracer.metrics.observe(
+                STAGE_FIRST_BYTE, time.perf_counter() - self._start, stage=self.stage, **self.labels
+            )
+
+    def add_bytes(self, count):
+        self.tracer.metrics.inc(STAGE_BYTES, count, stage=self.stage, **self.labels)
+
+    def fail(self, error):
+        """Count the stage as failed without raising (e.g. an HTTP status)"""
+        self.outcome = "error"
+        self.error = error
+
+    def __enter__(self):
+        self.tracer.metrics.add_gauge(STAGE_IN_FLIGHT, 1, stage=self.stage)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        metrics = self.tracer.metrics
+        metrics.add_gauge(STAGE_IN_FLIGHT, -1, stage=self.stage)
+        if exc_type is GeneratorExit:
+            self.outcome = "cancelled"  # the client went away, not an upstream failure
+        elif exc_type is not None:
+            self.fail(exc_type.__name__)
+        if self.outcome == "error":
+            metrics.inc(UPSTREAM_ERRORS, stage=self.stage, error=self.error)
+        metrics.observe(STAGE_DURATION, self.duration, stage=self.stage, outcome=self.outcome, **self.labels)
+        self.tracer._attach(self)
+        return False
+
+
+class Tracer:
+    """Per-stage spans feeding the /metrics histograms and a per-request trace.
+
+    Spans opened while handling a request (same thread) are also listed in
+    the response's Server-Timing header and logged when the request is slow.
+    Spans in worker threads or after the response has started only go to
+    the metrics.
+    """
+
+    def __init__(self):
+        self.metrics = MetricsRegistry()
+        self.metrics.describe(STAGE_DURATION, "histogram", "Duration of one pipeline stage or upstream call")
+        self.metrics.describe(STAGE_FIRST_BYTE, "histogram", "Time until a streamed stage produced its first chunk")
+        self.metrics.describe(STAGE_IN_FLIGHT, "gauge", "Stages currently running")
+        self.metrics.describe(STAGE_BYTES, "counter", "Bytes streamed by a stage")
+        self.metrics.describe(UPSTREAM_ERRORS, "counter", "Failed stages by error type")
+        self.metrics.describe(REQUEST_DURATION, "histogram", "Time until the response (or its headers) was returned")
+        self.metrics.describe(REQUESTS_IN_FLIGHT, "gauge", "Requests currently being handled")
+
+    def span(self, stage, **labels):
+        return Span(self, stage, labels)
+
+    def _attach(self, span):
+        if has_request_context():
+            spans = g.setdefault("trace_spans", [])
+            spans.append(span)
+
+
+# Global instance
+tracer = Tracer()
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(tracer.metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.before_app_request
+def start_request_trace():
+    g.trace_start = time.perf_counter()
+    tracer.metrics.add_gauge(REQUESTS_IN_FLIGHT, 1)
+
+
+@metrics_bp.after_app_request
+def finish_request_trace(response):
+    started = g.pop("trace_start", None)
+    if started is None:
+        return response
+    tracer.metrics.add_gauge(REQUESTS_IN_FLIGHT, -1)
+    duration = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    if endpoint != "/metrics":
+        tracer.metrics.observe(
+            REQUEST_DURATION, duration,
+            endpoint=endpoint, method=request.method, status=response.status_code,
+        )
+
+    spans = g.get("trace_spans", [])
+    if spans:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{s.stage};dur={s.duration * 1000:.1f}" for s in spans[:SERVER_TIMING_MAX_SPANS]
+        )
+    if duration > TRACE_SLOW_SECONDS:
+        breakdown = ", ".join(f"{s.stage}={s.duration:.3f}s ({s.outcome})" for s in spans) or "no spans"
+        logger.warning(f"Slow request {request.method} {endpoint}: {duration:.3f}s [{breakdown}]")
+    return response
+
+
+def init_tracing(app):
+    """Expose /metrics and time every request"""
+    app.register_blueprint(metrics_bp)
@@ -9,7 +9,7 @@ transcribe_bp = Blueprint("transcribe", __name__)
 
 # Whisper API configuration
 custom_whisper_api_key = "whisper.leanderziehm.com"
-custom_whisper_url = "https://whisper.leanderziehm.com/v1/"
+custom_whisper_url = os.getenv("WHISPER_BASE_URL", "https://whisper.leanderziehm.com/v1/")
 model = "Systran/faster-whisper-tiny"
 
 client = OpenAI(api_key=custom_whisper_api_key, base_url=custom_whisper_url)
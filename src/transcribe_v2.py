@@ -5,8 +5,25 @@ import tempfile
 import subprocess
 import os
 import logging
+import contextvars
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
+from src.audio_decode import (
+    DecodeError,
+    decoder_available,
+    decode_to_pcm,
+    pcm_to_wav,
+    pcm_duration,
+)
+from src.ffmpeg_pool import ffmpeg_pool, PoolSaturated, FFmpegJobError
+from src.ffmpeg_capabilities import ffmpeg_capabilities
+from src.vad import apply_vad
+from src.model_selector import WHISPER_TIERS, model_selector, segment_confidence
+from src.tracing import tracer
+from src.admission import AdmissionRejected, whisper_limiter, rejection_response
 
 
 # Set up logging
@@ -17,15 +34,27 @@ transcribe_bp = Blueprint("transcribe_bp", __name__)
 
 # Whisper API configuration
 CUSTOM_WHISPER_API_KEY = "whisper.leanderziehm.com"
-CUSTOM_WHISPER_URL = "https://whisper.leanderziehm.com/v1/"
-MODEL = "Systran/faster-whisper-tiny"
+CUSTOM_WHISPER_URL = os.getenv("WHISPER_BASE_URL", "https://whisper.leanderziehm.com/v1/")
+MODEL = WHISPER_TIERS[0]  # fastest tier; see model_selector for the ladder
 
 # Configuration
 MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
 SUPPORTED_FORMATS = {".webm", ".mp3", ".wav", ".m4a", ".ogg", ".flac"}
 FFMPEG_TIMEOUT = 30  # seconds
+MP3_ENCODERS = {"libmp3lame", "libshine", "mp3_mf"}
+FFMPEG_RETRY_AFTER = 2  # seconds, sent with 503 when the ffmpeg pool is full
 WHISPER_TIMEOUT = 30  # seconds
 
+# Hedged transcription: start the next config only when an attempt is slow
+TRANSCRIBE_HEDGED = os.getenv("TRANSCRIBE_HEDGED", "1") != "0"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0.9))  # of recent latencies
+HEDGE_DEFAULT_DELAY = 3.0  # seconds, until enough latencies are recorded
+HEDGE_MIN_DELAY = 0.3  # seconds
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+HEDGE_MAX_INFLIGHT = 2  # concurrent attempts per request
+HEDGE_POOL_WORKERS = 16
+
 
 # Initialize OpenAI client with error handling
 try:
@@ -42,6 +71,14 @@ class TranscriptionError(Exception):
     pass
 
 
+class AttemptFailed(Exception):
+    """A single Whisper attempt raised; carries its timing record"""
+
+    def __init__(self, timing):
+        super().__init__(timing.get("error"))
+        self.timing = timing
+
+
 class AudioProcessor:
     """Handles audio file processing and conversion"""
 
@@ -69,14 +106,8 @@ class AudioProcessor:
 
     @staticmethod
     def check_ffmpeg():
-        """Check if FFmpeg is available"""
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"], capture_output=True, timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        """Check if FFmpeg is available (cached probe, no subprocess)"""
+        return ffmpeg_capabilities.available
 
     @staticmethod
     def convert_to_whisper_format(input_path, output_path):
@@ -140,7 +171,16 @@ class AudioProcessor:
             ["ffmpeg", "-y", "-i", input_path, "-ar", "16000", "-ac", "1", output_path],
         ]
 
+        # Encoders each command needs; the WAV command only uses built-in PCM
+        required_encoders = [{"libmp3lame"}, MP3_ENCODERS, set(), MP3_ENCODERS]
         commands_to_try = [primary_cmd] + fallback_commands
+        if ffmpeg_capabilities.available:
+            # Go straight to the commands this ffmpeg build can actually run
+            commands_to_try = [
+                cmd
+                for cmd, required in zip(commands_to_try, required_encoders)
+                if not required or any(ffmpeg_capabilities.has_encoder(e) for e in required)
+            ]
 
         for i, cmd in enumerate(commands_to_try):
             try:
@@ -182,26 +222,70 @@ class AudioProcessor:
         )
 
 
+class LatencyTracker:
+    """Rolling window of successful Whisper attempt latencies, per model"""
+
+    def __init__(self, window=HEDGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}  # model -> deque of seconds
+
+    def record(self, model, seconds):
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def hedge_delay(self, model):
+        """Delay before firing a hedge: the configured latency percentile of this model"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        value = samples[min(len(samples) - 1, int(HEDGE_PERCENTILE * len(samples)))]
+        return min(max(value, HEDGE_MIN_DELAY), WHISPER_TIMEOUT)
+
+
 class WhisperTranscriber:
     """Handles Whisper API transcription with fallbacks"""
 
-    def __init__(self, client):
+    def __init__(self, client, hedged=TRANSCRIBE_HEDGED):
         self.client = client
+        self.hedged = hedged
+        self.latency = LatencyTracker()
+        self.selector = model_selector
+        self._pool = ThreadPoolExecutor(
+            max_workers=HEDGE_POOL_WORKERS, thread_name_prefix="whisper-attempt"
+        )
+
+    def transcribe_audio(self, audio, language=None, duration=None, escalate=True):
+        """Transcribe audio with multiple attempts and error handling
 
-    def transcribe_audio(self, audio_path, language=None):
-        """Transcribe audio with multiple attempts and error handling"""
+        audio is either a file path or in-memory WAV bytes. In hedged mode the
+        next config is only started once the current attempt is slower than
+        the HEDGE_PERCENTILE latency (or came back empty/failed), and the
+        first valid result wins. The model tier is picked by the selector from
+        duration; with escalate, a low-confidence result is redone one tier up.
+        """
 
         if not self.client:
             raise TranscriptionError("Whisper client not initialized")
 
-        if not os.path.exists(audio_path):
-            raise TranscriptionError(f"Audio file not found: {audio_path}")
-
-        file_size = os.path.getsize(audio_path)
-        if file_size == 0:
+        if isinstance(audio, bytes):
+            label = "in-memory WAV"
+        else:
+            if not os.path.exists(audio):
+                raise TranscriptionError(f"Audio file not found: {audio}")
+            label = audio
+            # Read once; every attempt uploads the same bytes
+            with open(audio, "rb") as audio_file:
+                audio = audio_file.read()
+
+        if len(audio) == 0:
             raise TranscriptionError("Audio file is empty")
 
-        logger.info(f"Transcribing audio file: {audio_path} ({file_size} bytes)")
+        logger.info(f"Transcribing audio file: {label} ({len(audio)} bytes)")
 
         # Multiple transcription attempts with different parameters
         transcription_configs = [
@@ -210,52 +294,207 @@ class WhisperTranscriber:
             {"temperature": 0.0},  # Auto-detect language
             {"temperature": 0.5},  # Higher temperature for difficult audio
         ]
-
-        for i, config in enumerate(transcription_configs):
+        # Without a language hint attempts 1 and 3 are identical; send it once
+        unique_configs = []
+        for config in transcription_configs:
+            config = {k: v for k, v in config.items() if v is not None}
+            if config not in unique_configs:
+                unique_configs.append(config)
+        transcription_configs = unique_configs
+        filename = "audio.wav" if audio[:4] == b"RIFF" else "audio.mp3"
+
+        model = self.selector.initial_model(duration)
+        result = self._transcribe_with(model, audio, filename, transcription_configs)
+        escalations = 0
+        while escalate:
+            better_model = self.selector.next_model(model, result, escalations)
+            if not better_model:
+                break
+            logger.info(
+                f"Confidence {result['confidence']} from {model}, retrying with {better_model}"
+            )
             try:
-                logger.info(f"Transcription attempt {i+1} with config: {config}")
-
-                with open(audio_path, "rb") as audio_file:
-                    response = self.client.audio.transcriptions.create(
-                        model=MODEL, file=audio_file, **config
-                    )
+                better = self._transcribe_with(better_model, audio, filename, transcription_configs)
+            except (TranscriptionError, AdmissionRejected) as e:
+                logger.warning(f"Escalation to {better_model} failed, keeping {model}: {e}")
+                break
+            self.selector.record_escalation(model, result["text"], better["text"])
+            better["attempts"] = result["attempts"] + better["attempts"]
+            result, model = better, better_model
+            escalations += 1
+
+        result["model"] = model
+        result["escalations"] = escalations
+        return result
+
+    def _transcribe_with(self, model, audio, filename, configs):
+        if self.hedged:
+            return self._transcribe_hedged(model, audio, filename, configs)
+        return self._transcribe_sequential(model, audio, filename, configs)
+
+    def _attempt(self, i, config, audio, filename, model=MODEL, queue=True):
+        """One Whisper call; returns (result or None if empty, timing)
+
+        With queue=False (hedges) the attempt only runs if a Whisper slot is
+        free right now; otherwise it fails as "shed". A queued attempt that is
+        rejected raises AdmissionRejected and fails the request.
+        """
+        logger.info(f"Transcription attempt {i+1} on {model} with config: {config}")
+        timing = {"attempt": i + 1, "model": model, "config": config}
+        try:
+            whisper_limiter.acquire(block=queue)
+        except AdmissionRejected as e:
+            if queue:
+                raise
+            timing.update(status="shed", error=str(e), latency=0.0)
+            raise AttemptFailed(timing) from e
+        started = time.perf_counter()
+        try:
+            with tracer.span("whisper", model=model):
+                response = self.client.audio.transcriptions.create(
+                    model=model,
+                    file=(filename, audio),
+                    response_format="verbose_json",  # segments carry the confidence signal
+                    timeout=WHISPER_TIMEOUT,
+                    **config,
+                )
+        except Exception as e:
+            timing.update(status="error", error=str(e),
+                          latency=round(time.perf_counter() - started, 3))
+            logger.error(f"Transcription attempt {i+1} failed: {e}")
+            raise AttemptFailed(timing) from e
+        finally:
+            whisper_limiter.release(time.perf_counter() - started)
+
+        latency = time.perf_counter() - started
+        timing["latency"] = round(latency, 3)
+        text = (getattr(response, "text", None) or "").strip()
+        if not text:
+            timing["status"] = "empty"
+            logger.warning(f"Attempt {i+1} returned empty transcription")
+            return None, timing
+
+        timing["status"] = "ok"
+        self.latency.record(model, latency)
+        logger.info(f"Transcription successful on attempt {i+1}: '{text[:50]}...'")
+
+        # Per-segment log-probabilities first, then whatever the server reports
+        confidence = segment_confidence(response)
+        confidence_source = "segments"
+        if confidence is None:
+            confidence = getattr(response, "confidence", None)
+            confidence_source = "server"
+        if confidence is None:
+            confidence_source = "estimate"
+            # Estimate confidence based on text length and attempt number
+            confidence = max(
+                0.5, 1.0 - (i * 0.1) - (1.0 / max(1, len(text.split())))
+            )
+        self.selector.record(
+            model, latency, confidence if confidence_source != "estimate" else None
+        )
 
-                if hasattr(response, "text") and response.text:
-                    text = response.text.strip()
-                    if len(text) > 0:
-                        logger.info(
-                            f"Transcription successful on attempt {i+1}: '{text[:50]}...'"
-                        )
+        return {
+            "text": text,
+            "confidence": confidence,
+            "confidence_source": confidence_source,
+            "language": getattr(response, "language", "unknown"),
+            "attempt": i + 1,
+        }, timing
+
+    def _transcribe_sequential(self, model, audio, filename, configs):
+        attempts = []
+        last_error = None
+        for i, config in enumerate(configs):
+            try:
+                result, timing = self._attempt(i, config, audio, filename, model)
+            except AttemptFailed as e:
+                attempts.append(e.timing)
+                last_error = e.timing["error"]
+                continue
+            attempts.append(timing)
+            if result:
+                result["attempts"] = attempts
+                return result
 
-                        # Try to extract confidence if available
-                        confidence = getattr(response, "confidence", None)
-                        if confidence is None:
-                            # Estimate confidence based on text length and attempt number
-                            confidence = max(
-                                0.5, 1.0 - (i * 0.1) - (1.0 / max(1, len(text.split())))
-                            )
-
-                        return {
-                            "text": text,
-                            "confidence": confidence,
-                            "language": getattr(response, "language", "unknown"),
-                            "attempt": i + 1,
-                        }
-                else:
-                    logger.warning(f"Attempt {i+1} returned empty transcription")
+        if last_error:
+            raise TranscriptionError(
+                f"All transcription attempts failed. Last error: {last_error}"
+            )
+        raise TranscriptionError("Failed to transcribe audio after all attempts")
 
-            except Exception as e:
-                logger.error(f"Transcription attempt {i+1} failed: {e}")
-                if i == len(transcription_configs) - 1:  # Last attempt
-                    raise TranscriptionError(
-                        f"All transcription attempts failed. Last error: {str(e)}"
-                    )
+    def _transcribe_hedged(self, model, audio, filename, configs):
+        delay = self.latency.hedge_delay(model)
+        pending = {}  # future -> (attempt index, launch offset)
+        attempts = []
+        last_error = None
+        next_index = 0
+        started = time.perf_counter()
+
+        def launch():
+            nonlocal next_index
+            # Copied context keeps the request's trace and priority visible to the worker.
+            # Hedges never queue for a Whisper slot: under load they would only add to it.
+            future = self._pool.submit(
+                contextvars.copy_context().run,
+                self._attempt, next_index, configs[next_index], audio, filename, model,
+                not pending,
+            )
+            pending[future] = (next_index, round(time.perf_counter() - started, 3))
+            next_index += 1
+
+        launch()
+        hedge_at = time.perf_counter() + delay
+
+        while pending:
+            can_hedge = next_index < len(configs) and len(pending) < HEDGE_MAX_INFLIGHT
+            timeout = max(0.0, hedge_at - time.perf_counter()) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than the hedge threshold: fire the next config
+                logger.info(f"Hedging after {delay:.2f}s with attempt {next_index + 1}")
+                launch()
+                hedge_at = time.perf_counter() + delay
                 continue
 
+            for future in done:
+                index, offset = pending.pop(future)
+                try:
+                    result, timing = future.result()
+                except AttemptFailed as e:
+                    result, timing = None, e.timing
+                    last_error = timing["error"]
+                timing["started_at"] = offset
+                attempts.append(timing)
+
+                if result:
+                    for other, (other_index, other_offset) in pending.items():
+                        other.cancel()  # still queued: never runs; in flight: ignored
+                        attempts.append({
+                            "attempt": other_index + 1,
+                            "config": configs[other_index],
+                            "status": "cancelled",
+                            "started_at": other_offset,
+                        })
+                    result["attempts"] = sorted(attempts, key=lambda a: a["attempt"])
+                    result["hedge_delay"] = round(delay, 3)
+                    return result
+
+            # Empty or failed: move on right away instead of waiting for the timer
+            if not pending and next_index < len(configs):
+                launch()
+                hedge_at = time.perf_counter() + delay
+
+        if last_error:
+            raise TranscriptionError(
+                f"All transcription attempts failed. Last error: {last_error}"
+            )
         raise TranscriptionError("Failed to transcribe audio after all attempts")
 
 
 # Global instances
+ffmpeg_capabilities.start()  # probe once at startup, re-probe in the background
 audio_processor = AudioProcessor()
 transcriber = WhisperTranscriber(client) if client else None
 
@@ -267,6 +506,16 @@ def transcribe():
     start_time = time.time()
     webm_path = None
     converted_path = None
+    # Shed before reading the upload when Whisper is saturated
+    whisper_limiter.check()
+    timings = {}  # seconds per stage, returned for benchmarks
+    mark = time.perf_counter()
+
+    def lap(stage):
+        nonlocal mark
+        now = time.perf_counter()
+        timings[stage] = round(timings.get(stage, 0.0) + now - mark, 4)
+        mark = now
 
     try:
         # Check if Whisper client is available
@@ -282,19 +531,6 @@ def transcribe():
                 503,
             )
 
-        # Check if FFmpeg is available
-        if not audio_processor.check_ffmpeg():
-            return (
-                jsonify(
-                    {
-                        "error": "FFmpeg not available",
-                        "details": "FFmpeg is required for audio processing",
-                        "fix": "Install FFmpeg: apt-get install ffmpeg (Ubuntu) or brew install ffmpeg (macOS)",
-                    }
-                ),
-                500,
-            )
-
         # Validate request
         if "audio" not in request.files:
             return (
@@ -327,62 +563,151 @@ def transcribe():
                 400,
             )
 
-        # Save uploaded file
-        try:
-            with tempfile.NamedTemporaryFile(
-                suffix=file_ext, delete=False
-            ) as temp_file:
-                webm_path = temp_file.name
-                audio_file.save(webm_path)
-                logger.info(f"Audio file saved to: {webm_path}")
-        except Exception as e:
+        # Decode in memory (no subprocess, no temp files, no lossy re-encode)
+        upload = audio_file.read()
+        if len(upload) > MAX_FILE_SIZE:
             return (
                 jsonify(
                     {
-                        "error": "Failed to save uploaded file",
-                        "details": str(e),
-                        "fix": "Check server disk space and permissions",
+                        "error": "Invalid audio file",
+                        "details": f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB",
+                        "fix": "Send a shorter recording",
                     }
                 ),
-                500,
+                400,
             )
+        lap("upload")  # request.files above reads the multipart body
 
-        # Convert audio to Whisper-compatible format
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-                converted_path = temp_file.name
+        pcm = None
+        final_audio = None
+        decode_path = "in_process"
+        if decoder_available(file_ext):
+            try:
+                with tracer.span("decode"):
+                    pcm = decode_to_pcm(upload, file_ext)
+                logger.info(
+                    f"Decoded in process: {pcm_duration(pcm):.2f}s of 16 kHz mono PCM"
+                )
+            except DecodeError as e:
+                logger.warning(f"In-process decode failed, falling back to FFmpeg: {e}")
+
+        if pcm is None:
+            decode_path = "ffmpeg"
+
+            # Check if FFmpeg is available
+            if not audio_processor.check_ffmpeg():
+                return (
+                    jsonify(
+                        {
+                            "error": "FFmpeg not available",
+                            "details": "FFmpeg is required for audio processing",
+                            "fix": "Install FFmpeg: apt-get install ffmpeg (Ubuntu) or brew install ffmpeg (macOS)",
+                        }
+                    ),
+                    500,
+                )
 
-            final_audio_path = audio_processor.convert_to_whisper_format(
-                webm_path, converted_path
-            )
-            logger.info(f"Audio converted to: {final_audio_path}")
+            # Warm ffmpeg worker over pipes (no temp files)
+            try:
+                pcm = ffmpeg_pool.convert(upload)
+                decode_path = "ffmpeg_pool"
+            except PoolSaturated as e:
+                return (
+                    jsonify(
+                        {
+                            "error": "Audio conversion busy",
+                            "details": str(e),
+                            "fix": "Retry in a few seconds",
+                        }
+                    ),
+                    503,
+                    {"Retry-After": str(FFMPEG_RETRY_AFTER)},
+                )
+            except FFmpegJobError as e:
+                logger.warning(f"Piped FFmpeg conversion failed, trying file-based ladder: {e}")
+
+        # Voice activity detection: trim dead air, reject clips without speech
+        vad_stats = {"enabled": False}
+        lap("decode")
+        if pcm is not None:
+            pcm, vad_stats = apply_vad(pcm)
+            lap("vad")
+            logger.info(f"VAD: {vad_stats}")
+            if pcm is None:
+                return (
+                    jsonify(
+                        {
+                            "error": "No speech detected",
+                            "details": "The recording only contains silence or noise",
+                            "fix": "Hold the microphone closer and speak after recording starts",
+                            "vad": vad_stats,
+                        }
+                    ),
+                    422,
+                )
+            final_audio = pcm_to_wav(pcm)
 
-        except TranscriptionError as e:
-            return (
-                jsonify(
-                    {
-                        "error": "Audio conversion failed",
-                        "details": str(e),
-                        "fix": "Try a different audio format or check if the file is corrupted",
-                    }
-                ),
-                500,
-            )
-        except Exception as e:
-            return (
-                jsonify(
-                    {
-                        "error": "Unexpected conversion error",
-                        "details": str(e),
-                        "fix": "Check FFmpeg installation and audio file integrity",
-                    }
-                ),
-                500,
-            )
+        if final_audio is None:
+            # Save uploaded file
+            try:
+                with tempfile.NamedTemporaryFile(
+                    suffix=file_ext, delete=False
+                ) as temp_file:
+                    webm_path = temp_file.name
+                    temp_file.write(upload)
+                    logger.info(f"Audio file saved to: {webm_path}")
+            except Exception as e:
+                return (
+                    jsonify(
+                        {
+                            "error": "Failed to save uploaded file",
+                            "details": str(e),
+                            "fix": "Check server disk space and permissions",
+                        }
+                    ),
+                    500,
+                )
+
+            # Convert audio to Whisper-compatible format
+            try:
+                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
+                    converted_path = temp_file.name
+
+                with tracer.span("ffmpeg_convert", path="file"):
+                    final_audio = audio_processor.convert_to_whisper_format(
+                        webm_path, converted_path
+                    )
+                logger.info(f"Audio converted to: {final_audio}")
+
+            except TranscriptionError as e:
+                return (
+                    jsonify(
+                        {
+                            "error": "Audio conversion failed",
+                            "details": str(e),
+                            "fix": "Try a different audio format or check if the file is corrupted",
+                        }
+                    ),
+                    500,
+                )
+            except Exception as e:
+                return (
+                    jsonify(
+                        {
+                            "error": "Unexpected conversion error",
+                            "details": str(e),
+                            "fix": "Check FFmpeg installation and audio file integrity",
+                        }
+                    ),
+                    500,
+                )
+            lap("decode")
 
         # Transcribe audio
         try:
-            result = transcriber.transcribe_audio(final_audio_path)
+            duration = pcm_duration(pcm) if pcm is not None else None
+            result = transcriber.transcribe_audio(final_audio, duration=duration)
+            lap("stt")
 
             processing_time = time.time() - start_time
             logger.info(f"Transcription completed in {processing_time:.2f} seconds")
@@ -394,9 +719,18 @@ def transcribe():
                     "language": result["language"],
                     "processing_time": round(processing_time, 2),
                     "attempt": result["attempt"],
+                    "attempts": result["attempts"],
+                    "hedge_delay": result.get("hedge_delay"),
+                    "model": result["model"],
+                    "escalations": result["escalations"],
+                    "decode_path": decode_path,
+                    "vad": vad_stats,
+                    "timings": timings,
                 }
             )
 
+        except AdmissionRejected as e:
+            return rejection_response(e)
         except TranscriptionError as e:
             return (
                 jsonify(
@@ -442,3 +776,21 @@ def transcribe():
                     logger.info(f"Cleaned up temporary file: {temp_path}")
                 except Exception as e:
                     logger.warning(f"Failed to clean up {temp_path}: {e}")
+
+
+@transcribe_bp.route("/api/ffmpeg_pool/status", methods=["GET"])
+def ffmpeg_pool_status():
+    """Queue depth and per-job timings of the ffmpeg worker pool"""
+    return jsonify(ffmpeg_pool.stats())
+
+
+@transcribe_bp.route("/api/ffmpeg/capabilities", methods=["GET"])
+def ffmpeg_capabilities_status():
+    """Cached FFmpeg version, codecs and formats"""
+    return jsonify(ffmpeg_capabilities.to_dict())
+
+
+@transcribe_bp.route("/api/whisper/models", methods=["GET"])
+def whisper_models_status():
+    """Latency / confidence trade-off per Whisper model tier"""
+    return jsonify(model_selector.report())
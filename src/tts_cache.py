@@ -0,0 +1,316 @@
+# tts_cache.py
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR", os.path.join(os.path.dirname(__file__), "tts_cache")
+)
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))  # 32MB
+TTS_CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_BYTES", 512 * 1024 * 1024))  # 512MB
+TTS_SYNTH_TIMEOUT = 120  # seconds a coalesced request waits for the leader
+
+
+def audio_key(text, voice_id, model_id):
+    """Content address for a synthesized clip"""
+    digest = hashlib.sha256()
+    for part in (voice_id, model_id, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _Pending:
+    """A synthesis in flight that other requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+class _TeeStream:
+    """A leader's synthesis, yielded to its client and stored once complete.
+
+    close() releases the coalesced waiters even if the response was never
+    iterated; a stream cut short stores nothing and the waiters synthesize
+    for themselves.
+    """
+
+    def __init__(self, cache, key, pending, chunks, first):
+        self.cache = cache
+        self.key = key
+        self.pending = pending
+        self.chunks = chunks
+        self.first = first
+        self._closed = False
+
+    def __iter__(self):
+        parts = [self.first]
+        try:
+            yield self.first
+            for chunk in self.chunks:
+                if isinstance(chunk, bytes):
+                    parts.append(chunk)
+                    yield chunk
+            self.cache.put(self.key, b"".join(parts))
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self.pending.error = e
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if hasattr(self.chunks, "close"):
+            self.chunks.close()
+        self.cache._finish(self.key, self.pending)
+
+
+class TTSCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of MP3 clips.
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    the synthesis, the others block until it lands in the cache.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, memory_bytes=TTS_CACHE_MEMORY_BYTES,
+                 disk_bytes=TTS_CACHE_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes, most recent last
+        self._memory_size = 0
+        self._disk = OrderedDict()  # key -> size on disk, most recent last
+        self._disk_size = 0
+        self._inflight = {}  # key -> _Pending
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan_disk()
+
+    # -- public API ---------------------------------------------------
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + ".mp3")
+
+    def get(self, key):
+        """Return cached bytes for key, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return data
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+
+        if not on_disk:
+            return None
+
+        try:
+            with open(self.path_for(key), "rb") as f:
+                data = f.read()
+            os.utime(self.path_for(key))  # keeps LRU order across restarts
+        except OSError:
+            with self._lock:
+                self._disk_size -= self._disk.pop(key, 0)
+            return None
+
+        with self._lock:
+            self.hits_disk += 1
+        self._remember(key, data)
+        return data
+
+    def get_or_synthesize(self, key, synthesize):
+        """Return bytes for key, running synthesize() at most once per key.
+
+        synthesize must return an iterable of MP3 byte chunks.
+        """
+        data, pending = self._lookup(key)
+        if data is not None:
+            return data
+        if pending is None:
+            # Evicted already (tiny cache) or the leader's client went away
+            return self.get_or_synthesize(key, synthesize)
+
+        try:
+            data = b"".join(chunk for chunk in synthesize() if isinstance(chunk, bytes))
+            if not data:
+                raise ValueError("Synthesis returned no audio")
+            self.put(key, data)
+            return data
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            self._finish(key, pending)
+
+    def get_or_stream(self, key, synthesize):
+        """(bytes, None) when cached or coalesced, else (None, chunk iterable).
+
+        On a miss the caller streams the synthesis to its client while it
+        is teed into the cache; concurrent callers for the key still wait
+        for it like in get_or_synthesize. The first chunk is pulled here,
+        so upstream errors raise before a response is started.
+        """
+        data, pending = self._lookup(key)
+        if data is not None:
+            return data, None
+        if pending is None:
+            return self.get_or_stream(key, synthesize)
+
+        chunks = iter(synthesize())
+        try:
+            first = next((chunk for chunk in chunks if isinstance(chunk, bytes)), None)
+            if not first:
+                raise ValueError("Synthesis returned no audio")
+        except Exception as e:
+            pending.error = e
+            if hasattr(chunks, "close"):
+                chunks.close()
+            self._finish(key, pending)
+            raise
+        return None, _TeeStream(self, key, pending, chunks, first)
+
+    def put(self, key, data):
+        self._remember(key, data)
+        self._write_disk(key, data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+    # -- internals ----------------------------------------------------
+
+    def _lookup(self, key):
+        """(bytes, None) if available, (None, _Pending) if we lead the
+        synthesis, (None, None) if the leader finished without a usable result
+        """
+        data = self.get(key)
+        if data is not None:
+            return data, None
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            return None, pending
+
+        if not pending.done.wait(TTS_SYNTH_TIMEOUT):
+            raise TimeoutError("Timed out waiting for in-flight synthesis")
+        if pending.error is not None:
+            raise pending.error
+        return self.get(key), None
+
+    def _finish(self, key, pending):
+        with self._lock:
+            if self._inflight.get(key) is pending:
+                del self._inflight[key]
+        pending.done.set()
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    def _write_disk(self, key, data):
+        if len(data) > self.disk_bytes:
+            return
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write TTS cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        """Evict least recently used clips until the disk tier fits"""
+        evict = []
+        with self._lock:
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evict.append(old_key)
+
+        for old_key in evict:
+            try:
+                os.remove(self.path_for(old_key))
+            except OSError:
+                pass
+
+    def _scan_disk(self):
+        """Rebuild the disk index (oldest first) from the cache directory"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[: -len(".mp3")], st.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+        self._trim_disk()
+        logger.info(f"TTS cache: {len(self._disk)} clips ({self._disk_size} bytes) on disk")
+
+
+# Global instance
+tts_cache = TTSCache()
@@ -0,0 +1,134 @@
+# vad.py
+import os
+import logging
+from src.audio_decode import SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    VAD_AVAILABLE = True
+except ImportError:
+    np = None
+    VAD_AVAILABLE = False
+    logger.info("numpy not installed, voice activity detection disabled")
+
+# Configuration
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") != "0"
+FRAME_MS = 30
+NOISE_PERCENTILE = 10  # quietest frames estimate the noise floor
+LOUD_PERCENTILE = 90  # loudest frames, to tell if the clip has any quiet stretch
+SPEECH_MARGIN_DB = 10  # speech must be this far above the noise floor
+MIN_SPEECH_SPREAD_DB = 3  # syllables make at least this much level change; steady noise doesn't
+NOISE_FLOOR_MAX_DBFS = -35  # a louder "floor" is speech or a tone, not background noise
+ABSOLUTE_FLOOR_DBFS = -50  # never treat quieter frames as speech
+MIN_SPEECH_MS = 90  # shorter bursts (clicks, taps) are ignored
+HANGOVER_MS = 200  # keep this much after speech ends (word tails)
+EDGE_PADDING_MS = 150  # silence kept before the first / after the last word
+MAX_PAUSE_MS = 600  # pauses longer than this are collapsed ...
+COLLAPSED_PAUSE_MS = 300  # ... down to this
+MIN_TOTAL_SPEECH_MS = 250  # below this the clip counts as "no speech"
+
+
+def _frames(ms):
+    return max(1, int(round(ms / FRAME_MS)))
+
+
+def _runs(mask):
+    """(start, end) index pairs of consecutive True values"""
+    if not mask.any():
+        return []
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def detect_speech(pcm):
+    """Return (frame_len, speech mask per frame) for 16 kHz s16le PCM"""
+    samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % SAMPLE_WIDTH], dtype="<i2")
+    frame_len = SAMPLE_RATE * FRAME_MS // 1000
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return frame_len, np.zeros(0, dtype=bool)
+
+    frames = samples[: n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1)) / 32768.0
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    quiet, loud = np.percentile(energy_db, [NOISE_PERCENTILE, LOUD_PERCENTILE])
+    if loud - quiet < MIN_SPEECH_SPREAD_DB:
+        # Flat level all the way through (fan, hum, room tone): nothing speech-like
+        return frame_len, np.zeros(n_frames, dtype=bool)
+    if loud - quiet < SPEECH_MARGIN_DB:
+        # No quiet stretch to measure noise on (continuous speech): the
+        # relative threshold would cut the clip, use only the absolute one
+        threshold = ABSOLUTE_FLOOR_DBFS
+    else:
+        noise_floor = min(quiet, NOISE_FLOOR_MAX_DBFS)
+        threshold = max(noise_floor + SPEECH_MARGIN_DB, ABSOLUTE_FLOOR_DBFS)
+    mask = energy_db > threshold
+
+    # Drop short bursts, then extend each speech run by the hangover
+    min_run, hangover = _frames(MIN_SPEECH_MS), _frames(HANGOVER_MS)
+    cleaned = np.zeros_like(mask)
+    for start, end in _runs(mask):
+        if end - start >= min_run:
+            cleaned[start:min(n_frames, end + hangover)] = True
+    return frame_len, cleaned
+
+
+def trim_silence(pcm):
+    """Trim edge silence and collapse long pauses.
+
+    Returns (pcm, stats); pcm is None when the clip contains no speech.
+    """
+    input_seconds = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    stats = {"enabled": True, "input_seconds": round(input_seconds, 2)}
+
+    frame_len, mask = detect_speech(pcm)
+    runs = _runs(mask)
+    speech_frames = int(mask.sum())
+    stats["speech_seconds"] = round(speech_frames * FRAME_MS / 1000, 2)
+    stats["speech_segments"] = len(runs)
+
+    if speech_frames * FRAME_MS < MIN_TOTAL_SPEECH_MS:
+        stats.update(output_seconds=0.0, dropped_seconds=stats["input_seconds"],
+                     dropped_ratio=1.0, speech=False)
+        return None, stats
+
+    frame_bytes = frame_len * SAMPLE_WIDTH
+    pad, max_pause, kept_pause = _frames(EDGE_PADDING_MS), _frames(MAX_PAUSE_MS), _frames(COLLAPSED_PAUSE_MS)
+    n_frames = len(mask)
+
+    pieces = []
+    for i, (start, end) in enumerate(runs):
+        if i == 0:
+            start = max(0, start - pad)
+        if i == len(runs) - 1:
+            end = min(n_frames, end + pad)
+            piece_end = len(pcm) if end == n_frames else end * frame_bytes
+        else:
+            next_start = runs[i + 1][0]
+            gap = next_start - end
+            # Keep short pauses whole; long ones shrink to kept_pause
+            end = next_start if gap <= max_pause else end + kept_pause
+            piece_end = end * frame_bytes
+        pieces.append(pcm[start * frame_bytes:piece_end])
+
+    trimmed = b"".join(pieces)
+    output_seconds = len(trimmed) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    dropped = max(0.0, input_seconds - output_seconds)
+    stats.update(
+        output_seconds=round(output_seconds, 2),
+        dropped_seconds=round(dropped, 2),
+        dropped_ratio=round(dropped / input_seconds, 3) if input_seconds else 0.0,
+        speech=True,
+    )
+    return trimmed, stats
+
+
+def apply_vad(pcm):
+    """trim_silence() when VAD is enabled and numpy is installed"""
+    if not (VAD_ENABLED and VAD_AVAILABLE):
+        return pcm, {"enabled": False}
+    return trim_silence(pcm)
@@ -0,0 +1,306 @@
+# voice_pipeline.py
+import re
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, Response, jsonify, url_for
+from src.chat import get_system_prompt, stream_tts, sse_event, get_session_id
+from src.llm_stream import stream_completion
+from src.conversation_memory import conversation_memory
+from src.admission import current_priority, request_priority, groq_limiter, elevenlabs_limiter
+
+logger = logging.getLogger(__name__)
+
+voice_bp = Blueprint("voice", __name__)
+
+# Configuration
+VOICE_TTS_WORKERS = 2  # sentences synthesized ahead of playback, per turn
+MIN_SENTENCE_CHARS = 12  # shorter fragments are merged into the next sentence
+TURN_TTL = 300  # seconds a finished turn stays fetchable
+TURN_WAIT_TIMEOUT = 60  # seconds a reader waits for the next piece
+
+# Sentence end: terminator (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r"[.!?…]+[\"'»“”)\]]*\s+|\n+")
+# Tokens ending in "." that do not end a sentence
+ABBREVIATIONS = {"z.b.", "d.h.", "u.a.", "usw.", "bzw.", "ca.", "dr.", "nr.", "etc.", "vgl.", "mr.", "mrs.", "e.g.", "i.e."}
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and hands out complete sentences"""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add text; return the list of sentences completed by it"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if self._is_false_end(candidate) or len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+    @staticmethod
+    def _is_false_end(candidate):
+        last_word = candidate.split()[-1].lower() if candidate.split() else ""
+        if last_word in ABBREVIATIONS:
+            return True
+        # Ordinals like "1." or "24." (German dates)
+        return last_word[:-1].isdigit() and last_word.endswith(".")
+
+
+def strip_id3(chunk):
+    """Drop a leading ID3v2 tag so stitched MP3 segments play continuously"""
+    if len(chunk) < 10 or not chunk.startswith(b"ID3"):
+        return chunk
+    size = (chunk[6] << 21) | (chunk[7] << 14) | (chunk[8] << 7) | chunk[9]
+    return chunk[10 + size:]
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+        self.chunks = []
+        self.done = False
+
+
+class VoiceTurn:
+    """One reply: LLM sentences fanned out to TTS, read back in order.
+
+    Each turn has its own small TTS pool, so a long reply can't hold up
+    the sentences of other calls. With speak=False no audio is made.
+    """
+
+    def __init__(self, user_msg, session_id, system_prompt, speak=True):
+        self.id = uuid.uuid4().hex
+        self.user_msg = user_msg
+        self.session_id = session_id
+        self.system_prompt = system_prompt
+        self.created = time.time()
+        self.cond = threading.Condition()
+        self.segments = []
+        self.llm_done = False
+        self.error = None
+        self.timings = {}
+        self.priority = current_priority()  # worker threads don't inherit the request's
+        self.speak = speak
+        self._start = time.perf_counter()
+        self._tts_pool = ThreadPoolExecutor(
+            max_workers=VOICE_TTS_WORKERS, thread_name_prefix=f"voice-tts-{self.id[:8]}"
+        ) if speak else None
+
+    # -- producer side ------------------------------------------------
+
+    def run(self):
+        """Stream the completion and start TTS for each finished sentence"""
+        splitter = SentenceSplitter()
+        messages = conversation_memory.build_messages(
+            self.session_id, self.system_prompt, self.user_msg
+        )
+        llm_timings = {}
+        reply = []
+        try:
+            with request_priority(self.priority):
+                for delta in stream_completion(messages, llm_timings):
+                    reply.append(delta)
+                    for sentence in splitter.feed(delta):
+                        self._add_sentence(sentence)
+            for sentence in splitter.flush():
+                self._add_sentence(sentence)
+            conversation_memory.add_turn(self.session_id, self.user_msg, "".join(reply))
+        except Exception as e:
+            logger.error(f"Voice turn {self.id} LLM stream failed: {e}")
+            self.error = str(e)
+        finally:
+            if self._tts_pool:
+                self._tts_pool.shutdown(wait=False)  # queued sentences still run
+            with self.cond:
+                self.llm_done = True
+                self.timings.update(
+                    llm_ttft=llm_timings.get("ttft"),
+                    llm_total=llm_timings.get("duration"),
+                )
+                self.cond.notify_all()
+
+    def _add_sentence(self, sentence):
+        with self.cond:
+            previous = self.segments[-1].text if self.segments else None
+            segment = _Segment(sentence)
+            segment.done = not self.speak
+            self.segments.append(segment)
+            if len(self.segments) == 1:
+                self.timings["first_sentence"] = self._elapsed()
+            self.cond.notify_all()
+        if self.speak:
+            self._tts_pool.submit(self._synthesize, segment, previous)
+
+    def _synthesize(self, segment, previous_text):
+        try:
+            # previous_text keeps prosody continuous across segments
+            options = {"previous_text": previous_text} if previous_text else {}
+            with request_priority(self.priority):
+                for chunk in stream_tts(segment.text, **options):
+                    with self.cond:
+                        if "first_audio" not in self.timings:
+                            self.timings["first_audio"] = self._elapsed()
+                        segment.chunks.append(chunk)
+                        self.cond.notify_all()
+        except Exception as e:
+            logger.error(f"Voice turn {self.id} TTS failed for segment: {e}")
+            with self.cond:
+                self.error = str(e)
+        finally:
+            with self.cond:
+                segment.done = True
+                self.cond.notify_all()
+
+    def _elapsed(self):
+        return round(time.perf_counter() - self._start, 3)
+
+    # -- consumer side ------------------------------------------------
+
+    def iter_audio(self):
+        """Yield MP3 bytes segment by segment, as soon as they arrive"""
+        index = 0
+        while True:
+            with self.cond:
+                ready = self.cond.wait_for(
+                    lambda: index < len(self.segments) or self.llm_done,
+                    timeout=TURN_WAIT_TIMEOUT,
+                )
+                if not ready or index >= len(self.segments):
+                    return
+                segment = self.segments[index]
+
+            position = 0
+            while True:
+                with self.cond:
+                    self.cond.wait_for(
+                        lambda: position < len(segment.chunks) or segment.done,
+                        timeout=TURN_WAIT_TIMEOUT,
+                    )
+                    new_chunks = segment.chunks[position:]
+                    finished = segment.done
+                for chunk in new_chunks:
+                    if index > 0 and position == 0:
+                        chunk = strip_id3(chunk)
+                    position += 1
+                    yield chunk
+                if finished and position >= len(segment.chunks):
+                    break
+                if not new_chunks and not finished:
+                    return  # timed out waiting for TTS
+            index += 1
+
+    def wait_finished(self, timeout=TURN_WAIT_TIMEOUT):
+        """Block until the LLM and every segment's TTS have finished"""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: self.llm_done and all(s.done for s in self.segments),
+                timeout=timeout,
+            )
+
+    def iter_sentences(self):
+        """Yield sentence texts in order as the LLM produces them"""
+        index = 0
+        while True:
+            with self.cond:
+                ready = self.cond.wait_for(
+                    lambda: index < len(self.segments) or self.llm_done,
+                    timeout=TURN_WAIT_TIMEOUT,
+                )
+                if not ready or index >= len(self.segments):
+                    return
+                sentence = self.segments[index].text
+            index += 1
+            yield sentence
+
+
+# Turn registry
+_turns = {}
+_turns_lock = threading.Lock()
+
+
+def _prune_turns():
+    cutoff = time.time() - TURN_TTL
+    with _turns_lock:
+        for turn_id in [t for t, turn in _turns.items() if turn.created < cutoff]:
+            del _turns[turn_id]
+
+
+def _get_turn(turn_id):
+    with _turns_lock:
+        return _turns.get(turn_id)
+
+
+@voice_bp.route("/voice/turn", methods=["POST"])
+def start_turn():
+    """Start a pipelined reply and return where to stream audio and text from"""
+    data = request.get_json(silent=True) or {}
+    user_msg = data.get("message")
+    if not user_msg:
+        return {"error": "Missing 'message' in JSON body."}, 400
+
+    speak = data.get("speak", True) is not False  # muted callers only get the text
+
+    # Shed now (429/503) rather than failing halfway through the reply
+    groq_limiter.check()
+    if speak:
+        elevenlabs_limiter.check()
+
+    _prune_turns()
+    turn = VoiceTurn(user_msg, get_session_id(data), get_system_prompt(data), speak)
+    with _turns_lock:
+        _turns[turn.id] = turn
+    threading.Thread(target=turn.run, name=f"voice-turn-{turn.id[:8]}", daemon=True).start()
+
+    return jsonify({
+        "turn_id": turn.id,
+        "session_id": turn.session_id,
+        "audio_url": url_for("voice.turn_audio", turn_id=turn.id) if speak else None,
+        "events_url": url_for("voice.turn_events", turn_id=turn.id),
+    }), 201
+
+
+@voice_bp.route("/voice/turn/<turn_id>/audio", methods=["GET"])
+def turn_audio(turn_id):
+    """One continuous MP3 stream stitched from the per-sentence segments"""
+    turn = _get_turn(turn_id)
+    if not turn:
+        return {"error": "Unknown or expired turn"}, 404
+    headers = {"Cache-Control": "no-store"}
+    return Response(turn.iter_audio(), mimetype="audio/mpeg", headers=headers)
+
+
+@voice_bp.route("/voice/turn/<turn_id>/events", methods=["GET"])
+def turn_events(turn_id):
+    """SSE: one 'sentence' event per sentence, then 'done' with timings"""
+    turn = _get_turn(turn_id)
+    if not turn:
+        return {"error": "Unknown or expired turn"}, 404
+
+    def generate():
+        for sentence in turn.iter_sentences():
+            yield sse_event({"text": sentence}, event="sentence")
+        turn.wait_finished()
+        if turn.error:
+            yield sse_event({"error": turn.error}, event="error")
+        with turn.cond:
+            timings = dict(turn.timings)
+        yield sse_event(timings, event="done")
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(generate(), mimetype="text/event-stream", headers=headers)
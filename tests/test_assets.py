@@ -0,0 +1,24 @@
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from src.assets import pick_encoding
+
+BOTH = {"br", "gzip"}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+    ("x-gzip-like", None),
+])
+def test_pick_encoding(header, expected):
+    assert pick_encoding(parse_accept_header(header, Accept), BOTH) == expected
+
+
+def test_pick_encoding_only_stored_variants():
+    assert pick_encoding(parse_accept_header("br, gzip", Accept), {"gzip"}) == "gzip"
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+import src.conversation_memory as memory_module
+from src.conversation_memory import ConversationMemory
+
+
+class _InlinePool:
+    """Runs summary jobs right away instead of on the background pool"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class _FakeGroq:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages[-1]["content"])
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="summary"))])
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    client = _FakeGroq()
+    monkeypatch.setattr(memory_module, "_summary_pool", _InlinePool())
+    monkeypatch.setattr(memory_module.groq_clients, "get", lambda: client)
+    monkeypatch.setattr(memory_module, "MEMORY_TOKEN_BUDGET", 100)
+    return client
+
+
+def _talk(memory, turns):
+    for i in range(turns):
+        memory.add_turn("s", f"u{i} " + "x" * 60, f"a{i} " + "y" * 60)
+
+
+def test_every_evicted_turn_reaches_a_summary(groq):
+    memory = ConversationMemory()
+    _talk(memory, 30)
+
+    summarized = "\n".join(groq.requests)
+    session = memory._session("s")
+    in_window = {m.content.split()[0] for m in session.window}
+    for i in range(30):
+        for label in (f"u{i}", f"a{i}"):
+            assert label in in_window or f": {label} " in summarized, label
+    assert session.dropped == 0
+
+
+def test_failed_summaries_cap_pending_turns(groq, monkeypatch):
+    monkeypatch.setattr(memory_module, "MEMORY_MAX_PENDING_TOKENS", 200)
+    groq.fail = True
+    memory = ConversationMemory()
+    _talk(memory, 30)
+
+    session = memory._session("s")
+    assert session.evicted_tokens <= 200
+    assert session.dropped > 0
+    assert memory.summary_failures > 0
@@ -0,0 +1,36 @@
+import src.live_transcribe as live
+from src.live_transcribe import LiveSession, _seconds_to_bytes
+
+
+class _NoDecoder:
+    """Stands in for the ffmpeg decoder; PCM is appended directly"""
+
+    error = None
+
+    def __init__(self, on_pcm):
+        pass
+
+    def finish(self):
+        pass
+
+
+def test_finish_transcribes_tail_after_commit_past_partial(monkeypatch):
+    calls = []
+
+    def transcribe_window(self, start, end):
+        calls.append((start, end))
+        return f"[{start}:{end}]"
+
+    monkeypatch.setattr(live, "StreamingDecoder", _NoDecoder)
+    monkeypatch.setattr(LiveSession, "_transcribe_window", transcribe_window)
+    session = LiveSession("sid")
+    chunk = _seconds_to_bytes(live.LIVE_CHUNK_SECONDS)
+    pcm_len = chunk + _seconds_to_bytes(2)
+
+    # The last partial covered more than a full chunk past the commit
+    session._append_pcm(b"\0" * pcm_len)
+    session._refresh_partial()
+    result = session.finish()
+
+    assert calls[-1] == (chunk, pcm_len)  # the tail after the commit was transcribed
+    assert result["text"].endswith(f"[{chunk}:{pcm_len}]")
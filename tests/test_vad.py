@@ -0,0 +1,44 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.audio_decode import SAMPLE_RATE
+from src.vad import trim_silence
+
+
+def _pcm(signal):
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def _noise(seconds, dbfs, rng):
+    # Gaussian noise whose RMS sits at the given level
+    return rng.normal(0, 10 ** (dbfs / 20), int(seconds * SAMPLE_RATE))
+
+
+def _speech_like(seconds, rng):
+    # Noise with a ~4 Hz syllable envelope and no pauses
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.3 + 0.7 * np.abs(np.sin(2 * np.pi * 2 * t))
+    return rng.normal(0, 0.1, len(t)) * envelope
+
+
+def test_constant_noise_is_not_speech():
+    rng = np.random.default_rng(0)
+    pcm, stats = trim_silence(_pcm(_noise(3, -40, rng)))
+    assert pcm is None
+    assert stats["speech"] is False
+
+
+def test_continuous_speech_is_kept_whole():
+    rng = np.random.default_rng(1)
+    pcm, stats = trim_silence(_pcm(_speech_like(3, rng)))
+    assert stats["speech"] is True
+    assert stats["dropped_seconds"] == 0.0
+
+
+def test_silence_around_speech_is_trimmed():
+    rng = np.random.default_rng(2)
+    clip = np.concatenate([_noise(1, -60, rng), _speech_like(1, rng), _noise(1, -60, rng)])
+    pcm, stats = trim_silence(_pcm(clip))
+    assert stats["speech"] is True
+    assert 1.0 <= stats["output_seconds"] < 2.0